@@ -12,7 +12,6 @@ Usage:
     python add_dp_to_review.py --task-id draft_001_a
 """
 
-import argparse
 import csv
 import json
 import os
@@ -25,97 +24,126 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 
+# Paths are resolved once relative to this script (dp_builder_workspace)
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent.parent
+DATA_PIPELINE_PATH = REPO_ROOT / 'data_pipeline.py'
+# Command prefix for invoking data_pipeline.py with the current interpreter
+DATA_PIPELINE_CMD = (sys.executable, str(DATA_PIPELINE_PATH))
+STAGING_PATH = SCRIPT_DIR / 'staging' / 'datapoints.csv'
+REVIEW_PATH = SCRIPT_DIR / 'review' / 'datapoints_for_review.csv'
+ARTIFACTS_PATH = SCRIPT_DIR / 'artifacts' / 'final_dps'
+
 # Define standard columns for datapoints
 STANDARD_COLUMNS = [
     'task_id', 'prompt', 'dockerfile', 'test_functions', 
     'test_weights', 'additional_files', 'difficulty', 'created_at', 'updated_at', 'reviewed_at'
 ]
 
+# Add the repo root to path to import shared_tools
+sys.path.insert(0, str(REPO_ROOT))
+
+# Standard columns copied from staging; reviewed_at is added when moving to review
+NORMALIZED_COLUMNS = tuple(col for col in STANDARD_COLUMNS if col != 'reviewed_at')
+
 
-def read_staging_data(staging_path: Path) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Read all data from staging CSV."""
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with second precision."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def remove_task_streaming(staging_path: Path, task_id: str) -> Tuple[Optional[Dict[str, str]], str]:
+    """Copy the staging CSV to a temp file, leaving out the row for task_id.
+    
+    The staging CSV itself is not modified; the caller commits the removal with
+    os.replace once the datapoint is safely in review, or deletes the temp file.
+    Returns the removed row (None if the task was not found) and the temp path.
+    """
     if not staging_path.exists():
         raise FileNotFoundError(f"Staging CSV not found: {staging_path}")
     
-    with open(staging_path, 'r') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=staging_path.parent)
+    datapoint = None
     
-    return rows, fieldnames
+    try:
+        with open(staging_path, 'r', newline='', buffering=1 << 20) as f_in, \
+                os.fdopen(temp_fd, 'w', newline='', buffering=1 << 20) as f_out:
+            reader = csv.reader(f_in)
+            writer = csv.writer(f_out)
+            
+            fieldnames = next(reader, [])
+            writer.writerow(fieldnames)
+            task_id_index = fieldnames.index('task_id')
+            
+            # Copy every row except the first one matching task_id
+            for row in reader:
+                if not row:
+                    continue
+                if datapoint is None and row[task_id_index] == task_id:
+                    datapoint = dict(zip(fieldnames, row))
+                    continue
+                writer.writerow(row)
+            
+            # Make the staged copy durable before it can be renamed into place
+            f_out.flush()
+            os.fsync(f_out.fileno())
+        
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    return datapoint, temp_path
 
 
-def find_task(rows: List[Dict[str, str]], task_id: str) -> Tuple[Optional[Dict[str, str]], Optional[int]]:
-    """Find a task in the rows list, returning the task data and its index."""
-    for i, row in enumerate(rows):
-        if row['task_id'] == task_id:
-            return row, i
-    return None, None
+def fsync_directory(directory: Path) -> None:
+    """fsync a directory so that a rename inside it is durable."""
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 def ensure_review_csv(review_path: Path) -> List[str]:
-    """Ensure the review CSV exists with proper headers, return existing columns if any."""
+    """Ensure the review CSV exists with STANDARD_COLUMNS as its header.
+
+    A review CSV written with a different column layout is migrated once, so
+    that new datapoints can simply be appended afterwards.
+    """
     if not review_path.exists():
         review_path.parent.mkdir(parents=True, exist_ok=True)
         with open(review_path, 'w', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=STANDARD_COLUMNS)
             writer.writeheader()
         return STANDARD_COLUMNS
-    else:
-        # Read existing columns
-        with open(review_path, 'r') as f:
-            reader = csv.DictReader(f)
-            return reader.fieldnames if reader.fieldnames else STANDARD_COLUMNS
-
-
-def normalize_datapoint(datapoint: Dict[str, str]) -> Dict[str, str]:
-    """Ensure datapoint has all standard columns, filling missing ones with empty strings."""
-    normalized = {}
-    for col in STANDARD_COLUMNS:
-        if col == 'reviewed_at':
-            # Skip reviewed_at as it will be added when moving to review
-            continue
-        normalized[col] = datapoint.get(col, '')
-    return normalized
-
-
-def add_to_review_safely(datapoint: Dict[str, str], review_path: Path) -> None:
-    """Add a datapoint to the review CSV with transaction safety."""
-    # Normalize the datapoint to ensure all columns are present
-    normalized_dp = normalize_datapoint(datapoint)
     
-    # Add review timestamp
-    normalized_dp['reviewed_at'] = datetime.now(timezone.utc).isoformat()
+    with open(review_path, 'r', newline='') as f:
+        header = next(csv.reader(f), None)
+    
+    if header != STANDARD_COLUMNS:
+        migrate_review_csv(review_path)
     
-    # Create a temporary file for the new review CSV
+    return STANDARD_COLUMNS
+
+
+def migrate_review_csv(review_path: Path) -> None:
+    """Rewrite the review CSV so that every row uses STANDARD_COLUMNS."""
     temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=review_path.parent)
     
     try:
-        # If review CSV exists, copy existing content
-        if review_path.exists():
-            with open(review_path, 'r') as f_in, os.fdopen(temp_fd, 'w', newline='') as f_out:
-                reader = csv.DictReader(f_in)
-                
-                # Ensure we use standard columns for consistency
-                writer = csv.DictWriter(f_out, fieldnames=STANDARD_COLUMNS)
-                writer.writeheader()
-                
-                # Copy existing rows, normalizing them
-                for row in reader:
-                    normalized_row = normalize_datapoint(row)
-                    # Preserve existing reviewed_at timestamps
-                    if 'reviewed_at' in row:
-                        normalized_row['reviewed_at'] = row['reviewed_at']
-                    writer.writerow(normalized_row)
-                
-                # Add the new datapoint
-                writer.writerow(normalized_dp)
-        else:
-            # Create new file with just this datapoint
-            with os.fdopen(temp_fd, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=STANDARD_COLUMNS)
-                writer.writeheader()
-                writer.writerow(normalized_dp)
+        with open(review_path, 'r', newline='') as f_in, os.fdopen(temp_fd, 'w', newline='') as f_out:
+            reader = csv.DictReader(f_in)
+            writer = csv.DictWriter(f_out, fieldnames=STANDARD_COLUMNS)
+            writer.writeheader()
+            
+            # Copy existing rows, normalizing them
+            for row in reader:
+                normalized_row = normalize_datapoint(row)
+                # Preserve existing reviewed_at timestamps
+                normalized_row['reviewed_at'] = row.get('reviewed_at') or ''
+                writer.writerow(normalized_row)
         
         # Atomically replace the original file
         os.replace(temp_path, review_path)
@@ -127,28 +155,42 @@ def add_to_review_safely(datapoint: Dict[str, str], review_path: Path) -> None:
         raise
 
 
-def remove_from_staging(rows: List[Dict[str, str]], task_index: int, 
-                       fieldnames: List[str], staging_path: Path) -> None:
-    """Remove a task from staging CSV by writing all rows except the one at task_index."""
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=staging_path.parent)
-    try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # Write all rows except the one being removed
-            for i, row in enumerate(rows):
-                if i != task_index:
-                    writer.writerow(row)
-        
-        # Replace original file
-        os.replace(temp_path, staging_path)
+def normalize_datapoint(datapoint: Dict[str, str]) -> Dict[str, str]:
+    """Ensure datapoint has all standard columns, filling missing ones with empty strings."""
+    return {col: datapoint.get(col) or '' for col in NORMALIZED_COLUMNS}
+
+
+def add_to_review_safely(datapoint: Dict[str, str], review_path: Path) -> None:
+    """Append a datapoint to the review CSV.
+    
+    Relies on ensure_review_csv having already normalized the header, so only
+    the new row is written instead of rewriting the whole file.
+    """
+    # Normalize the datapoint to ensure all columns are present
+    normalized_dp = normalize_datapoint(datapoint)
+    
+    # Add review timestamp
+    normalized_dp['reviewed_at'] = utc_now_iso()
+    
+    with open(review_path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=STANDARD_COLUMNS)
+        writer.writerow(normalized_dp)
         
-    except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        raise
+        # Make sure the row is on disk before staging is touched
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_fragments(path: Path, fragments: List[bytes]) -> None:
+    """Write fragments to path, gathering them into as few writev calls as possible."""
+    # Imported here so --help and early exits don't load shared_tools
+    from shared_tools.fileio import write_all
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        write_all(fd, fragments)
+    finally:
+        os.close(fd)
 
 
 def create_final_artifact(datapoint: Dict[str, str], artifacts_path: Path) -> Path:
@@ -165,19 +207,24 @@ def create_final_artifact(datapoint: Dict[str, str], artifacts_path: Path) -> Pa
     except:
         weights_display = datapoint['test_weights']
     
-    # Parse additional files for display
-    additional_files_display = ""
+    # Parse additional files for display; malformed JSON or entries just cut
+    # the section short, as the artifact is written after the review row
+    additional_files_parts = []
     if 'additional_files' in datapoint and datapoint['additional_files']:
         try:
             additional_files = json.loads(datapoint['additional_files'])
             if additional_files:
-                additional_files_display = "\n\n## Additional Files\n"
+                additional_files_parts.append("\n\n## Additional Files\n")
                 for filename, content in additional_files.items():
-                    additional_files_display += f"### {filename}\n```\n{content[:500]}{'...' if len(content) > 500 else ''}\n```\n"
+                    additional_files_parts.append(
+                        f"### {filename}\n```\n{content[:500]}{'...' if len(content) > 500 else ''}\n```\n"
+                    )
         except:
             pass
     
-    content = f"""# Datapoint: {task_id}
+    # Collect the document as fragments and write them with writev
+    parts = [
+        f"""# Datapoint: {task_id}
 
 ## Status
 - Created: {datapoint.get('created_at', 'N/A')}
@@ -186,32 +233,28 @@ def create_final_artifact(datapoint: Dict[str, str], artifacts_path: Path) -> Pa
 - Difficulty: {datapoint.get('difficulty', 'N/A')}
 
 ## Prompt
-{datapoint['prompt']}
-
-## Dockerfile
-```dockerfile
-{datapoint['dockerfile']}
-```
-
-## Test Functions
-```python
-{datapoint['test_functions']}
-```
-
-## Test Weights
-{weights_display}{additional_files_display}
-
----
-*This datapoint has been validated and is ready for final review.*
-"""
+""",
+        datapoint['prompt'],
+        "\n\n## Dockerfile\n```dockerfile\n",
+        datapoint['dockerfile'],
+        "\n```\n\n## Test Functions\n```python\n",
+        datapoint['test_functions'],
+        "\n```\n\n## Test Weights\n",
+        weights_display
+    ]
     
-    with open(artifact_path, 'w') as f:
-        f.write(content)
+    parts.extend(additional_files_parts)
+    parts.append("\n\n---\n*This datapoint has been validated and is ready for final review.*\n")
+    
+    write_fragments(artifact_path, [part.encode('utf-8') for part in parts])
     
     return artifact_path
 
 
-def main():
+def build_arg_parser() -> 'argparse.ArgumentParser':
+    """Build the full argparse parser (used for --help and malformed arguments)."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Move a validated datapoint from staging to review dataset",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -231,106 +274,101 @@ This will:
     
     parser.add_argument('--task-id', required=True, help='Task ID to move to review')
     
-    args = parser.parse_args()
-    
-    # Define paths
-    base_path = Path(__file__).parent
-    staging_path = base_path / 'staging' / 'datapoints.csv'
-    review_path = base_path / 'review' / 'datapoints_for_review.csv'
-    artifacts_path = base_path / 'artifacts' / 'final_dps'
+    return parser
+
+
+def parse_task_id(argv: List[str]) -> Optional[str]:
+    """Return the task ID from a plain '--task-id ID' command line, else None."""
+    if len(argv) == 2 and argv[0] == '--task-id' and not argv[1].startswith('-'):
+        return argv[1]
+    if len(argv) == 1 and argv[0].startswith('--task-id='):
+        return argv[0].split('=', 1)[1]
+    return None
+
+
+def main():
+    # argparse is only needed for help output and argument errors
+    task_id = parse_task_id(sys.argv[1:])
+    if task_id is None:
+        task_id = build_arg_parser().parse_args().task_id
     
     try:
-        # Read staging data
-        rows, fieldnames = read_staging_data(staging_path)
-        
-        # Find the task (but don't remove it yet!)
-        datapoint, task_index = find_task(rows, args.task_id)
+        # Find the task and stage its removal in one pass (but don't remove it yet!)
+        datapoint, staging_temp_path = remove_task_streaming(STAGING_PATH, task_id)
         if datapoint is None:
-            print(f"Error: Task '{args.task_id}' not found in staging", file=sys.stderr)
+            os.unlink(staging_temp_path)
+            print(f"Error: Task '{task_id}' not found in staging", file=sys.stderr)
             sys.exit(1)
         
-        # Ensure review CSV exists and get its columns
-        review_columns = ensure_review_csv(review_path)
-        
         # TRANSACTION SAFETY: First add to review, then remove from staging
-        
-        # Step 1: Add to review (this might fail)
-        add_to_review_safely(datapoint, review_path)
-        
-        # Step 2: Create artifact (this might fail)
-        artifact_path = create_final_artifact(datapoint, artifacts_path)
-        
-        # Step 3: Only if the above succeeded, remove from staging
-        remove_from_staging(rows, task_index, fieldnames, staging_path)
-        
-        # Step 4: Complete the draft task
         try:
-            # Complete the draft task as successful
-            complete_cmd = [
-                "python", str(base_path.parent.parent / "data_pipeline.py"),
-                "complete", args.task_id,
-                "--status", "completed"
-            ]
+            # Ensure review CSV exists with the standard columns
+            ensure_review_csv(REVIEW_PATH)
             
-            complete_result = subprocess.run(complete_cmd, capture_output=True, text=True, check=True)
-            task_completed = True
+            # Step 1: Add to review (this might fail)
+            add_to_review_safely(datapoint, REVIEW_PATH)
             
-        except subprocess.CalledProcessError as e:
-            print(f"Warning: Failed to complete draft task: {e}")
-            print(f"Error output: {e.stderr}")
-            task_completed = False
-        except Exception as e:
-            print(f"Warning: Unexpected error completing draft task: {e}")
-            task_completed = False
+            # Step 2: Create artifact (this might fail)
+            artifact_path = create_final_artifact(datapoint, ARTIFACTS_PATH)
+        except Exception:
+            os.unlink(staging_temp_path)
+            raise
+        
+        # Step 3: Only if the above succeeded, remove from staging. The review
+        # row is already fsynced, so a crash before this rename can at worst
+        # leave the datapoint in both CSVs, never in neither.
+        os.replace(staging_temp_path, STAGING_PATH)
+        fsync_directory(STAGING_PATH.parent)
         
-        # Step 5: Create a review task for the Review Agent
+        # Steps 4 & 5: Complete the draft task and create a review task for the
+        # Review Agent with a single data_pipeline.py invocation
+        task_data = {
+            "review_csv_id": task_id,
+            "artifact_path": str(artifact_path.relative_to(REPO_ROOT)),
+            "submitted_at": datetime.now().isoformat()
+        }
+        ops = [
+            {"op": "complete", "task_id": task_id, "status": "completed"},
+            # The draft task becomes the parent of the review task
+            {"op": "create-task", "type": "review_dp", "parent": task_id, "data": task_data}
+        ]
+        
+        task_completed = False
+        review_task_id = None
         try:
-            # Prepare task data
-            task_data = {
-                "review_csv_id": args.task_id,
-                "artifact_path": str(artifact_path.relative_to(base_path.parent.parent)),
-                "submitted_at": datetime.now().isoformat()
-            }
+            cmd = [*DATA_PIPELINE_CMD, "batch", "--ops", json.dumps(ops)]
             
-            # Create the review task using data_pipeline.py
-            cmd = [
-                "python", str(base_path.parent.parent / "data_pipeline.py"),
-                "create-task",
-                "--type", "review_dp",
-                "--parent", args.task_id,  # The draft task becomes the parent
-                "--data", json.dumps(task_data)
-            ]
+            result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True)
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            # Parse the per-op results
+            complete_result, create_result = json.loads(result.stdout)["results"]
             
-            # Parse the result to get the new task ID
-            result_data = json.loads(result.stdout)
-            review_task_id = result_data.get("task_id", "unknown")
+            task_completed = complete_result.get("status") == "success"
+            if not task_completed:
+                print(f"Warning: Failed to complete draft task: {complete_result.get('message')}")
             
-            print(f"✓ Moved datapoint '{args.task_id}' to review")
-            print(f"  - Added to: review/datapoints_for_review.csv")
-            print(f"  - Removed from: staging/datapoints.csv")
-            print(f"  - Artifact created: {artifact_path.relative_to(base_path)}")
-            print(f"  - Draft task completed: {'Yes' if task_completed else 'Failed'}")
-            print(f"  - Review task created: {review_task_id}")
+            if create_result.get("status") == "success":
+                review_task_id = create_result.get("task_id", "unknown")
+            else:
+                print(f"Warning: Failed to create review task: {create_result.get('message')}")
             
         except subprocess.CalledProcessError as e:
-            print(f"Warning: Failed to create review task: {e}")
+            print(f"Warning: Failed to update data pipeline tasks: {e}")
             print(f"Error output: {e.stderr}")
-            # Still report success for the main operation
-            print(f"✓ Moved datapoint '{args.task_id}' to review (but review task creation failed)")
-            print(f"  - Added to: review/datapoints_for_review.csv")
-            print(f"  - Removed from: staging/datapoints.csv")
-            print(f"  - Artifact created: {artifact_path.relative_to(base_path)}")
-            print(f"  - Draft task completed: {'Yes' if task_completed else 'Failed'}")
         except Exception as e:
-            print(f"Warning: Unexpected error creating review task: {e}")
-            # Still report success for the main operation
-            print(f"✓ Moved datapoint '{args.task_id}' to review (but review task creation failed)")
-            print(f"  - Added to: review/datapoints_for_review.csv")
-            print(f"  - Removed from: staging/datapoints.csv")
-            print(f"  - Artifact created: {artifact_path.relative_to(base_path)}")
-            print(f"  - Draft task completed: {'Yes' if task_completed else 'Failed'}")
+            print(f"Warning: Unexpected error updating data pipeline tasks: {e}")
+        
+        # Still report success for the main operation if the task updates failed
+        if review_task_id:
+            print(f"✓ Moved datapoint '{task_id}' to review")
+        else:
+            print(f"✓ Moved datapoint '{task_id}' to review (but review task creation failed)")
+        print(f"  - Added to: review/datapoints_for_review.csv")
+        print(f"  - Removed from: staging/datapoints.csv")
+        print(f"  - Artifact created: {artifact_path.relative_to(SCRIPT_DIR)}")
+        print(f"  - Draft task completed: {'Yes' if task_completed else 'Failed'}")
+        if review_task_id:
+            print(f"  - Review task created: {review_task_id}")
         
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -2,8 +2,8 @@
 """
 create_dp.py - Create a new datapoint using shared workspace structure
 
-This version creates files directly in the shared workspace and uses patch_additional_files.py
-for syncing additional files to the CSV.
+This version creates files directly in the shared workspace and uses patch_additional_files
+(imported in-process) for syncing additional files to the CSV.
 
 Usage:
     python create_dp.py \
@@ -15,16 +15,34 @@ Usage:
         --difficulty medium
 """
 
-import argparse
 import csv
 import json
+import mmap
 import os
+import re
 import sys
 import shutil
-import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+
+# Paths are resolved once relative to this script (dp_builder_workspace)
+SCRIPT_DIR = Path(__file__).parent
+REPO_ROOT = SCRIPT_DIR.parent.parent
+SHARED_WORKSPACE_DIR = REPO_ROOT / 'shared_workspace' / 'data_points'
+STAGING_PATH = SCRIPT_DIR / 'staging' / 'datapoints.csv'
+
+# Matches test function definitions, capturing the function name
+TEST_DEF_RE = re.compile(r'^[ \t]*(?:async[ \t]+)?def[ \t]+(test_\w+)', re.MULTILINE)
+
+# Add the repo root to path to import shared_tools
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string with second precision."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
 
 
 def ensure_staging_csv(staging_path: Path) -> None:
@@ -44,9 +62,24 @@ def task_exists_in_staging(staging_path: Path, task_id: str) -> bool:
     if not staging_path.exists():
         return False
     
-    with open(staging_path, 'r') as f:
-        reader = csv.DictReader(f)
-        return any(row['task_id'] == task_id for row in reader)
+    # Cheap negative check: if the id never occurs in the raw bytes, the task
+    # cannot be in the CSV. A hit still needs the CSV parse below, since the id
+    # may only appear inside another datapoint's content.
+    with open(staging_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(task_id.encode('utf-8')) == -1:
+                return False
+    
+    with open(staging_path, 'r', newline='', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return False
+        
+        task_id_index = header.index('task_id')
+        return any(row and row[task_id_index] == task_id for row in reader)
 
 
 def read_file_content(file_path: Path, file_type: str) -> str:
@@ -55,11 +88,17 @@ def read_file_content(file_path: Path, file_type: str) -> str:
         raise FileNotFoundError(f"{file_type} file not found: {file_path}")
     
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        with open(file_path, 'rb') as f:
+            raw = f.read()
         
-        if not content.strip():
+        if not raw.strip():
             raise ValueError(f"{file_type} file is empty: {file_path}")
+        
+        content = raw.decode('utf-8')
+        
+        # Match text-mode reads, which translate \r\n and \r to \n
+        if b'\r' in raw:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
             
         return content
     except Exception as e:
@@ -79,10 +118,8 @@ def validate_weights(weights_content: str) -> Dict[str, float]:
     if not weights:
         raise ValueError("Weights cannot be empty")
     
-    total = sum(weights.values())
-    if abs(total - 1.0) > 0.001:  # Allow small floating point errors
-        raise ValueError(f"Weights must sum to 1.0, got {total}")
-    
+    # Check each entry and accumulate the total in a single pass
+    total = 0.0
     for test_name, weight in weights.items():
         if not test_name.startswith('test_'):
             raise ValueError(f"Test name must start with 'test_': {test_name}")
@@ -90,15 +127,17 @@ def validate_weights(weights_content: str) -> Dict[str, float]:
             raise ValueError(f"Weight must be numeric: {test_name}={weight}")
         if weight <= 0:
             raise ValueError(f"Weight must be positive: {test_name}={weight}")
+        total += weight
+    
+    if abs(total - 1.0) > 0.001:  # Allow small floating point errors
+        raise ValueError(f"Weights must sum to 1.0, got {total}")
     
     return weights
 
 
 def get_workspace_path(task_id: str) -> Path:
     """Get the workspace path for a task."""
-    # Go up from dp_builder_workspace to data_generation_pipeline
-    base_path = Path(__file__).parent.parent.parent / 'shared_workspace' / 'data_points' / task_id
-    return base_path
+    return SHARED_WORKSPACE_DIR / task_id
 
 
 def create_workspace_structure(workspace_path: Path) -> None:
@@ -116,32 +155,50 @@ def copy_file_to_workspace(source_file: Path, workspace_path: Path, target_name:
     if source_file.resolve() == target_path.resolve():
         return
     
-    shutil.copy2(source_file, target_path)
+    shutil.copyfile(source_file, target_path)
+
+
+def walk_files(root: Path) -> Iterator[Tuple[str, str]]:
+    """Yield (path, path relative to root) for every file below root.
+    
+    Uses os.scandir so file/directory checks come from the directory entries
+    instead of a separate stat per path.
+    """
+    root_str = os.fspath(root)
+    prefix_len = len(os.path.join(root_str, ''))
+    stack = [root_str]
+    
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, entry.path[prefix_len:]
 
 
 def copy_additional_files(source_dir: Path, workspace_path: Path) -> int:
-    """Copy additional files to workspace files directory."""
+    """Copy additional files to workspace files directory, returning the file count."""
     files_dir = workspace_path / 'files'
     files_dir.mkdir(exist_ok=True)
     
-    # If source and target are the same directory, just count files
-    if source_dir.resolve() == files_dir.resolve():
-        file_count = sum(1 for _ in files_dir.rglob('*') if _.is_file())
-        return file_count
+    # If source and target are the same directory, files are only counted
+    in_place = source_dir.resolve() == files_dir.resolve()
     
     file_count = 0
-    for file_path in source_dir.rglob('*'):
-        if file_path.is_file():
-            rel_path = file_path.relative_to(source_dir)
-            target_path = files_dir / rel_path
-            
-            # Create parent directories if needed
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Skip if source and target are the same
-            if file_path.resolve() != target_path.resolve():
-                shutil.copy2(file_path, target_path)
-            file_count += 1
+    for file_path, rel_path in walk_files(source_dir):
+        file_count += 1
+        if in_place:
+            continue
+        
+        target_path = files_dir / rel_path
+        
+        # Create parent directories if needed
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Skip if source and target are the same
+        if Path(file_path).resolve() != target_path.resolve():
+            shutil.copyfile(file_path, target_path)
     
     return file_count
 
@@ -167,9 +224,10 @@ def create_datapoint(
     weights = validate_weights(weights_json)
     
     # Validate tests contain the functions referenced in weights
-    for test_name in weights:
-        if f"def {test_name}" not in tests:
-            raise ValueError(f"Test function '{test_name}' not found in tests file")
+    defined_tests = set(TEST_DEF_RE.findall(tests))
+    missing_tests = [test_name for test_name in weights if test_name not in defined_tests]
+    if missing_tests:
+        raise ValueError(f"Test function(s) not found in tests file: {', '.join(missing_tests)}")
     
     # Create workspace structure
     workspace_path = get_workspace_path(task_id)
@@ -193,7 +251,7 @@ def create_datapoint(
             print(f"✓ Copied {additional_file_count} additional files to workspace")
     
     # Create initial CSV entry (without additional_files content)
-    timestamp = datetime.now(timezone.utc).isoformat()
+    timestamp = utc_now_iso()
     datapoint = {
         'task_id': task_id,
         'prompt': prompt,
@@ -206,10 +264,14 @@ def create_datapoint(
         'updated_at': timestamp
     }
     
-    # Append to staging CSV
-    with open(staging_path, 'a', newline='') as f:
+    # Append to staging CSV; a large buffer lets the row go out in one write
+    with open(staging_path, 'a', newline='', buffering=1 << 20) as f:
         writer = csv.DictWriter(f, fieldnames=datapoint.keys())
         writer.writerow(datapoint)
+        
+        # Make sure the row is on disk before additional files are synced
+        f.flush()
+        os.fsync(f.fileno())
     
     print(f"✓ Created datapoint '{task_id}' in staging CSV")
     print(f"  - Prompt: {len(prompt)} chars")
@@ -219,21 +281,11 @@ def create_datapoint(
     
     # If there are additional files, sync them using patch_additional_files.py
     if additional_file_count > 0:
-        patch_tool_path = Path(__file__).parent.parent.parent / 'shared_tools' / 'patch_additional_files.py'
-        
+        # Imported here: it pulls in csv_rows and concurrent.futures, which
+        # datapoints without additional files never need
+        from shared_tools.patch_additional_files import patch_additional_files
         try:
-            result = subprocess.run([
-                sys.executable,
-                str(patch_tool_path),
-                '--task-id', task_id,
-                '--csv-path', str(staging_path),
-                '--mode', 'sync'
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(f"✓ Synced additional files to CSV")
-            else:
-                print(f"Warning: Failed to sync additional files: {result.stderr}")
+            patch_additional_files(task_id, 'sync', staging_path)
         except Exception as e:
             print(f"Warning: Could not sync additional files: {e}")
     
@@ -243,6 +295,9 @@ def create_datapoint(
 
 
 def main():
+    # Imported here so that importing create_dp as a module stays cheap
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Create a new datapoint using shared workspace structure",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -270,7 +325,7 @@ This will:
 1. Create a workspace at shared_workspace/data_points/{task_id}/
 2. Copy all files to the workspace
 3. Create an entry in the staging CSV
-4. Sync additional files to CSV using patch_additional_files.py
+4. Sync additional files to CSV using patch_additional_files
         """
     )
     
@@ -285,15 +340,12 @@ This will:
     
     args = parser.parse_args()
     
-    # Define staging CSV path
-    staging_path = Path(__file__).parent / 'staging' / 'datapoints.csv'
-    
     try:
         # Ensure staging CSV exists
-        ensure_staging_csv(staging_path)
+        ensure_staging_csv(STAGING_PATH)
         
         # Check if task already exists
-        if task_exists_in_staging(staging_path, args.task_id):
+        if task_exists_in_staging(STAGING_PATH, args.task_id):
             print(f"Error: Task '{args.task_id}' already exists in staging", file=sys.stderr)
             print("Use patch_dp.py to update existing datapoints", file=sys.stderr)
             sys.exit(1)
@@ -305,7 +357,7 @@ This will:
             args.dockerfile_file,
             args.tests_file,
             args.weights_file,
-            staging_path,
+            STAGING_PATH,
             args.difficulty,
             args.additional_files_dir
         )
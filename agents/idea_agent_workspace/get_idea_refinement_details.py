@@ -5,6 +5,8 @@ This tool provides criteria and guidance for the idea agent to refine their
 brainstormed ideas down to the final n selections.
 """
 
+import sys
+
 REFINEMENT_GUIDELINES = """# Idea Refinement Guidelines
 
 ## Selection Criteria
@@ -71,7 +73,8 @@ Before finalizing your n selections:
 """
 
 def main():
-    print(REFINEMENT_GUIDELINES)
+    # Single write of the constant text, matching print()'s trailing newline
+    sys.stdout.write(REFINEMENT_GUIDELINES + "\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,12 +5,19 @@ This is a simple CLI tool that returns the number of tasks to create (n)
 and the brainstorming multiplier.
 """
 
+import sys
+
+N_TASKS = 5
+MULTIPLIER = 4
+
+# The output never changes, so it is formatted once at import
+TASK_PARAMETERS = (
+    f"Task specs to create (n): {N_TASKS}\n"
+    f"Brainstorming multiplier: {MULTIPLIER}x\n"
+)
+
 def main():
-    n_tasks = 5
-    multiplier = 4
-    
-    print(f"Task specs to create (n): {n_tasks}")
-    print(f"Brainstorming multiplier: {multiplier}x")
+    sys.stdout.write(TASK_PARAMETERS)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
@@ -11,54 +11,181 @@ Usage:
 
 import argparse
 import csv
+import fcntl
+import mmap
 import os
 import shutil
-import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 
-# Add parent directories to path to import shared_tools
+# Add parent directories to path so shared_tools and data_pipeline can be imported
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir.parent.parent))
 
-from shared_tools.categories_tags import (
-    validate_category, 
-    validate_tags,
-    get_category_set,
-    VALID_CATEGORIES
-)
+# Production CSV used when neither --latest-csv nor $LATEST_CSV is given
+DEFAULT_LATEST_CSV = '/Users/danaustin/Documents/Projects/terminal_bench_training/workings/ds/datasets/v1/versioned_datasets/latest.csv'
 
+# ioctl request that clones a file's extents copy-on-write (see ioctl_ficlone(2))
+FICLONE = 0x40049409
 
-def read_csv_data(csv_path: Path) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Read all data from CSV file."""
+# Columns of a freshly created production CSV
+PROD_FIELDNAMES = [
+    'task_id', 'difficulty', 'title', 'use_case_category', 'prompt', 
+    'category', 'tags', 'dockerfile', 'test_functions', 'test_weights',
+    'additional_files', 'created_at', 'updated_at'
+]
+
+
+def get_field(row: Sequence[str], pos: Dict[str, int], name: str, default: str) -> str:
+    """Return a column value by name, or default when the CSV has no such column."""
+    index = pos.get(name)
+    return row[index] if index is not None else default
+
+
+def find_task_row(csv_path: Path, task_id: str) -> Tuple[List[str], Tuple[str, ...]]:
+    """Stream a CSV file and return its header and the row for a given task ID."""
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
     
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+    # Cheap negative check: if the id never occurs in the raw bytes, the task
+    # cannot be in the CSV. A hit still needs the CSV parse below, since the id
+    # may only appear inside another datapoint's content.
+    with open(csv_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Task '{task_id}' not found in CSV")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(task_id.encode('utf-8')) == -1:
+                raise ValueError(f"Task '{task_id}' not found in CSV")
     
-    return rows, fieldnames
+    with open(csv_path, 'r', newline='', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        task_id_index = fieldnames.index('task_id')
+        for row in reader:
+            if row and row[task_id_index] == task_id:
+                # Pad short rows so every column can be addressed by position
+                if len(row) < len(fieldnames):
+                    row.extend([''] * (len(fieldnames) - len(row)))
+                return fieldnames, tuple(row)
+    raise ValueError(f"Task '{task_id}' not found in CSV")
 
 
-def find_task_row(rows: List[Dict[str, str]], task_id: str) -> Tuple[int, Dict[str, str]]:
-    """Find the row index and data for a given task ID."""
-    for i, row in enumerate(rows):
-        if row['task_id'] == task_id:
-            return i, row
-    raise ValueError(f"Task '{task_id}' not found in CSV")
+def write_reviewed_copy(csv_path: Path, pos: Dict[str, int], task_id: str, reviewed_at: str) -> str:
+    """Write a synced temp copy of a review CSV with reviewed_at set on the task's row.
+    
+    pos maps each review column name to its index. Rows are streamed from the
+    original file into the temp file, so only one row is held in memory at a time.
+    Returns the temp file path; the caller swaps it in with os.replace.
+    """
+    task_id_index = pos['task_id']
+    reviewed_at_index = pos['reviewed_at']
+    
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=csv_path.parent)
+    try:
+        with open(csv_path, 'r', newline='', buffering=1 << 20) as src, \
+                os.fdopen(temp_fd, 'w', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(src)
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(next(reader, []))
+            for row in reader:
+                if row and row[task_id_index] == task_id:
+                    if len(row) <= reviewed_at_index:
+                        row.extend([''] * (reviewed_at_index + 1 - len(row)))
+                    row[reviewed_at_index] = reviewed_at
+                    writer.writerow(row)
+                    break
+                writer.writerow(row)
+            writer.writerows(reader)
+            f.flush()
+            os.fsync(f.fileno())
+        
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    return temp_path
+
+
+def write_new_csv(csv_path: Path, fieldnames: List[str], row: Sequence[str]) -> str:
+    """Write a synced temp file holding a header and a single row for a new CSV.
+    
+    Returns the temp file path; the caller swaps it in with os.replace.
+    """
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=csv_path.parent)
+    try:
+        with os.fdopen(temp_fd, 'w', newline='') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(fieldnames)
+            writer.writerow(row)
+            f.flush()
+            os.fsync(f.fileno())
+        
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    
+    return temp_path
+
+
+def scan_for_task_id(csv_path: Path, task_id: str) -> Tuple[List[str], int]:
+    """Stream a CSV file, failing as soon as the task ID is found.
+    
+    Returns the header and the number of data rows.
+    """
+    with open(csv_path, 'r', newline='', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        task_id_index = fieldnames.index('task_id')
+        row_count = 0
+        for row in reader:
+            if not row:
+                continue
+            if row[task_id_index] == task_id:
+                raise ValueError(f"Task '{task_id}' already exists in production dataset")
+            row_count += 1
+    return fieldnames, row_count
 
 
-def backup_file(file_path: Path, backup_dir: Path) -> Path:
-    """Create a timestamped backup of a file using dataset_YYYYMMDD_HHMMSS format."""
-    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+def ends_with_line_break(file_path: Path) -> bool:
+    """Check whether a file is empty or its last byte ends a line."""
+    with open(file_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return True
+        f.seek(size - 1)
+        return f.read(1) in (b'\n', b'\r')
+
+
+def backup_file(file_path: Path, backup_dir: Path, timestamp: str) -> Path:
+    """Create a timestamped backup of a file using dataset_YYYYMMDD_HHMMSS format.
+    
+    The production CSV is appended to in place, so the backup must not share its
+    inode (a hardlink would see the new row). On filesystems with reflink
+    support (Linux only) the backup is a copy-on-write clone; otherwise it is a
+    full copy.
+    """
     backup_name = f"dataset_{timestamp}.csv"
     backup_path = backup_dir / backup_name
     
+    # FICLONE is a Linux ioctl number; other platforms go straight to a copy
+    if sys.platform.startswith('linux'):
+        try:
+            with open(file_path, 'rb') as src, open(backup_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            pass
+        else:
+            shutil.copystat(file_path, backup_path)
+            return backup_path
+    
     shutil.copy2(file_path, backup_path)
     return backup_path
 
@@ -79,59 +206,59 @@ def approve_datapoint(
     If complete_task is True, automatically marks the task as completed in data_pipeline.
     review_task_id is the review task ID to complete (e.g., review_dp_xxx), if different from task_id.
     """
+    # Imported here so --help and argument errors don't pay for them
+    from shared_tools.categories_tags import validate_category, validate_tags, VALID_CATEGORIES_STR
+    
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    
     # Validate category
     if not validate_category(category):
-        raise ValueError(f"Invalid category '{category}'. Must be one of: {', '.join(sorted(VALID_CATEGORIES))}")
+        raise ValueError(f"Invalid category '{category}'. Must be one of: {VALID_CATEGORIES_STR}")
     
     # Validate tags
     is_valid, error_msg = validate_tags(tags)
     if not is_valid:
         raise ValueError(f"Invalid tags: {error_msg}")
     
-    # Read review CSV
-    review_rows, review_fieldnames = read_csv_data(review_csv_path)
-    
-    # Find the datapoint to approve
-    review_index, datapoint = find_task_row(review_rows, task_id)
+    # Find the datapoint to approve in the review CSV
+    review_fieldnames, review_row = find_task_row(review_csv_path, task_id)
+    review_pos = {name: i for i, name in enumerate(review_fieldnames)}
     
     # No need to check if already reviewed - just check if it exists in production
     
-    # Read production CSV or create new structure
-    if latest_csv_path.exists():
-        prod_rows, prod_fieldnames = read_csv_data(latest_csv_path)
-        
-        # Check for duplicates
-        for row in prod_rows:
-            if row['task_id'] == task_id:
-                raise ValueError(f"Task '{task_id}' already exists in production dataset")
+    # Check for duplicates without loading the production CSV
+    prod_exists = latest_csv_path.exists()
+    if prod_exists:
+        prod_fieldnames, prod_count = scan_for_task_id(latest_csv_path, task_id)
     else:
         # Create new production CSV with required fields
-        prod_rows = []
-        prod_fieldnames = [
-            'task_id', 'difficulty', 'title', 'use_case_category', 'prompt', 
-            'category', 'tags', 'dockerfile', 'test_functions', 'test_weights',
-            'additional_files', 'created_at', 'updated_at'
-        ]
+        prod_fieldnames, prod_count = PROD_FIELDNAMES, 0
+    
+    # Prepare the approved datapoint as a row ordered like PROD_FIELDNAMES
+    approved_row = (
+        review_row[review_pos['task_id']],
+        get_field(review_row, review_pos, 'difficulty', 'medium'),
+        review_row[review_pos['task_id']],  # Use task_id as title
+        category,  # Use the category as use_case_category
+        review_row[review_pos['prompt']],
+        category,
+        tags,
+        review_row[review_pos['dockerfile']],
+        review_row[review_pos['test_functions']],
+        review_row[review_pos['test_weights']],
+        get_field(review_row, review_pos, 'additional_files', '{}'),
+        get_field(review_row, review_pos, 'created_at', now_iso),
+        get_field(review_row, review_pos, 'updated_at', now_iso)
+    )
     
-    # Prepare the approved datapoint
-    approved_datapoint = {
-        'task_id': datapoint['task_id'],
-        'difficulty': datapoint.get('difficulty', 'medium'),
-        'title': datapoint['task_id'],  # Use task_id as title
-        'use_case_category': category,  # Use the category as use_case_category
-        'prompt': datapoint['prompt'],
-        'category': category,
-        'tags': tags,
-        'dockerfile': datapoint['dockerfile'],
-        'test_functions': datapoint['test_functions'],
-        'test_weights': datapoint['test_weights'],
-        'additional_files': datapoint.get('additional_files', '{}'),
-        'created_at': datapoint.get('created_at', datetime.now(timezone.utc).isoformat()),
-        'updated_at': datapoint.get('updated_at', datetime.now(timezone.utc).isoformat())
-    }
+    # Reorder only when an existing production CSV uses a different header
+    if prod_fieldnames != PROD_FIELDNAMES:
+        approved_pos = {name: i for i, name in enumerate(PROD_FIELDNAMES)}
+        approved_row = tuple(get_field(approved_row, approved_pos, name, '') for name in prod_fieldnames)
     
     # Set default backup directory if not provided
-    if backup_dir is None and latest_csv_path.exists():
+    if backup_dir is None and prod_exists:
         backup_dir = latest_csv_path.parent / 'archive'
     
     # Create backup directory if it doesn't exist
@@ -139,77 +266,79 @@ def approve_datapoint(
         backup_dir.mkdir(parents=True, exist_ok=True)
     
     # Backup existing production CSV
-    if backup_dir and latest_csv_path.exists():
-        backup_path = backup_file(latest_csv_path, backup_dir)
+    if backup_dir and prod_exists:
+        backup_path = backup_file(latest_csv_path, backup_dir, now.strftime('%Y%m%d_%H%M%S'))
         print(f"✓ Created backup: {backup_path}")
     
-    # Add to production dataset
-    prod_rows.append(approved_datapoint)
-    
-    # Write updated production CSV atomically
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=latest_csv_path.parent)
+    temp_review_path = temp_prod_path = None
     try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=prod_fieldnames, quoting=csv.QUOTE_ALL)
-            writer.writeheader()
-            writer.writerows(prod_rows)
+        # Add to production dataset
+        prod_count += 1
         
-        # Replace original file
-        os.replace(temp_path, latest_csv_path)
-        
-    except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        raise
-    
-    # Update review CSV to mark as reviewed
-    review_rows[review_index]['reviewed_at'] = datetime.now(timezone.utc).isoformat()
-    
-    # Write updated review CSV
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=review_csv_path.parent)
-    try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=review_fieldnames, quoting=csv.QUOTE_ALL)
-            writer.writeheader()
-            writer.writerows(review_rows)
+        if prod_exists:
+            # Stage the review CSV update first, so it is ready before production changes
+            temp_review_path = write_reviewed_copy(review_csv_path, review_pos, task_id, now_iso)
+            
+            # Production CSV is append-only and the backup holds the previous state
+            with open(latest_csv_path, 'a', newline='') as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+                # A hand-edited file may lack its final line break, which
+                # would merge the new row into the last record
+                if not ends_with_line_break(latest_csv_path):
+                    f.write(writer.dialect.lineterminator)
+                writer.writerow(approved_row)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            # Both files are staged as temp copies, so write and fsync them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                review_future = executor.submit(
+                    write_reviewed_copy, review_csv_path, review_pos, task_id, now_iso
+                )
+                prod_future = executor.submit(
+                    write_new_csv, latest_csv_path, prod_fieldnames, approved_row
+                )
+            
+            # Keep whichever temp files were written so the cleanup below sees them
+            if review_future.exception() is None:
+                temp_review_path = review_future.result()
+            if prod_future.exception() is None:
+                temp_prod_path = prod_future.result()
+            review_future.result()
+            prod_future.result()
         
-        # Replace original file
-        os.replace(temp_path, review_csv_path)
+        # Swap the staged files in back-to-back
+        if temp_prod_path:
+            os.replace(temp_prod_path, latest_csv_path)
+        os.replace(temp_review_path, review_csv_path)
         
     except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Clean up any temp file that was not swapped in
+        for temp_path in (temp_prod_path, temp_review_path):
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
         raise
     
     # Report success
     print(f"✓ Approved datapoint '{task_id}'")
     print(f"  - Added to production: {latest_csv_path}")
     print(f"  - Updated review status: {review_csv_path}")
-    print(f"  - Total production datapoints: {len(prod_rows)}")
+    print(f"  - Total production datapoints: {prod_count}")
     
     # Complete the task in data_pipeline if requested
     if complete_task:
+        # Use review_task_id if provided, otherwise use task_id
+        task_to_complete = review_task_id if review_task_id else task_id
+        
         try:
-            # Get the path to data_pipeline.py relative to this script
-            script_dir = Path(__file__).parent
-            data_pipeline_path = script_dir.parent.parent / 'data_pipeline.py'
-            
-            # Use review_task_id if provided, otherwise use task_id
-            task_to_complete = review_task_id if review_task_id else task_id
+            from data_pipeline import DataPipeline
             
-            cmd = [
-                'python', str(data_pipeline_path),
-                'complete', task_to_complete,
-                '--status', 'completed'
-            ]
+            result = DataPipeline().cmd_complete(task_to_complete, 'completed')
+            if result.get('status') == 'success':
+                print(f"✓ Marked task '{task_to_complete}' as completed in data pipeline")
+            else:
+                print(f"⚠️  Warning: Failed to complete task in data pipeline: {result.get('message')}")
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"✓ Marked task '{task_to_complete}' as completed in data pipeline")
-            
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️  Warning: Failed to complete task in data pipeline: {e.stderr}")
         except Exception as e:
             print(f"⚠️  Warning: Failed to complete task in data pipeline: {str(e)}")
 
@@ -236,8 +365,7 @@ Example:
     parser.add_argument('--task-id', required=True, 
                         help='Task ID to approve')
     parser.add_argument('--latest-csv', type=Path,
-                        default=Path('/Users/danaustin/Documents/Projects/terminal_bench_training/workings/ds/datasets/v1/versioned_datasets/latest.csv'),
-                        help='Path to the production latest.csv file (default: /Users/danaustin/Documents/Projects/terminal_bench_training/workings/ds/datasets/v1/versioned_datasets/latest.csv)')
+                        help=f'Path to the production latest.csv file (default: $LATEST_CSV, else {DEFAULT_LATEST_CSV})')
     parser.add_argument('--category', required=True,
                         help='Category for the datapoint (e.g., software-engineering)')
     parser.add_argument('--tags', required=True,
@@ -251,6 +379,10 @@ Example:
     
     args = parser.parse_args()
     
+    # Resolve the production CSV only when it wasn't given explicitly
+    if args.latest_csv is None:
+        args.latest_csv = Path(os.environ.get('LATEST_CSV', DEFAULT_LATEST_CSV))
+    
     try:
         approve_datapoint(
             args.task_id,
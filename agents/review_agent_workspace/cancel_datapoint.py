@@ -13,14 +13,18 @@ Usage:
 import argparse
 import csv
 import json
+import mmap
 import os
-import subprocess
 import sys
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+# Add parent directories to path so data_pipeline can be imported
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir.parent.parent))
+
 
 # Valid cancellation categories
 CANCELLATION_CATEGORIES = [
@@ -32,25 +36,68 @@ CANCELLATION_CATEGORIES = [
 ]
 
 
-def read_csv_data(csv_path: Path) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Read all data from CSV file."""
+def find_task_row(csv_path: Path, task_id: str) -> Tuple[List[str], Tuple[str, ...]]:
+    """Stream a CSV file and return its header and the row for a given task ID."""
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
     
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
+    # Cheap negative check: if the id never occurs in the raw bytes, the task
+    # cannot be in the CSV. A hit still needs the CSV parse below, since the id
+    # may only appear inside another datapoint's content.
+    with open(csv_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Task '{task_id}' not found in CSV")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(task_id.encode('utf-8')) == -1:
+                raise ValueError(f"Task '{task_id}' not found in CSV")
     
-    return rows, fieldnames
+    with open(csv_path, 'r', newline='', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        task_id_index = fieldnames.index('task_id')
+        for row in reader:
+            if row and row[task_id_index] == task_id:
+                # Pad short rows so every column can be addressed by position
+                if len(row) < len(fieldnames):
+                    row.extend([''] * (len(fieldnames) - len(row)))
+                return fieldnames, tuple(row)
+    raise ValueError(f"Task '{task_id}' not found in CSV")
 
 
-def find_task_row(rows: List[Dict[str, str]], task_id: str) -> Tuple[int, Dict[str, str]]:
-    """Find the row index and data for a given task ID."""
-    for i, row in enumerate(rows):
-        if row['task_id'] == task_id:
-            return i, row
-    raise ValueError(f"Task '{task_id}' not found in CSV")
+def mark_reviewed(csv_path: Path, pos: Dict[str, int], task_id: str, reviewed_at: str) -> None:
+    """Atomically rewrite a review CSV with reviewed_at set on the task's row.
+    
+    pos maps each review column name to its index. Rows are streamed from the
+    original file into the temp file, so only one row is held in memory at a time.
+    """
+    task_id_index = pos['task_id']
+    reviewed_at_index = pos['reviewed_at']
+    
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=csv_path.parent)
+    try:
+        with open(csv_path, 'r', newline='', buffering=1 << 20) as src, \
+                os.fdopen(temp_fd, 'w', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(src)
+            writer = csv.writer(f)
+            writer.writerow(next(reader, []))
+            for row in reader:
+                if row and row[task_id_index] == task_id:
+                    if len(row) <= reviewed_at_index:
+                        row.extend([''] * (reviewed_at_index + 1 - len(row)))
+                    row[reviewed_at_index] = reviewed_at
+                    writer.writerow(row)
+                    break
+                writer.writerow(row)
+            writer.writerows(reader)
+        
+        # Replace original file
+        os.replace(temp_path, csv_path)
+        
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
 
 
 def create_cancellation_artifact(
@@ -58,12 +105,13 @@ def create_cancellation_artifact(
     reason: str,
     category: str,
     attempts: int = 0,
-    details: Dict[str, any] = None
+    details: Dict[str, any] = None,
+    cancelled_at: str = None
 ) -> Dict[str, any]:
     """Create a cancellation artifact with structured feedback."""
     artifact = {
         'task_id': task_id,
-        'cancelled_at': datetime.now(timezone.utc).isoformat(),
+        'cancelled_at': cancelled_at or datetime.now(timezone.utc).isoformat(),
         'cancelled_by': 'review_agent',
         'category': category,
         'reason': reason,
@@ -94,22 +142,25 @@ def cancel_datapoint(
     
     Returns the path to the cancellation artifact file.
     """
+    now_iso = datetime.now(timezone.utc).isoformat()
+    
     # Validate category
     if category not in CANCELLATION_CATEGORIES:
         raise ValueError(f"Invalid category '{category}'. Valid categories: {', '.join(CANCELLATION_CATEGORIES)}")
     
-    # Read review CSV
-    review_rows, review_fieldnames = read_csv_data(review_csv_path)
-    
-    # Find the datapoint to reject
-    review_index, datapoint = find_task_row(review_rows, task_id)
+    # Find the datapoint to reject in the review CSV
+    review_fieldnames, review_row = find_task_row(review_csv_path, task_id)
+    review_pos = {name: i for i, name in enumerate(review_fieldnames)}
+    reviewed_at_index = review_pos['reviewed_at']
     
     # Check if already processed (using reviewed_at field)
-    if datapoint.get('reviewed_at'):
-        raise ValueError(f"Task '{task_id}' has already been reviewed at {datapoint['reviewed_at']}")
+    if review_row[reviewed_at_index]:
+        raise ValueError(f"Task '{task_id}' has already been reviewed at {review_row[reviewed_at_index]}")
     
     # Create cancellation artifact
-    cancellation_artifact = create_cancellation_artifact(task_id, reason, category, attempts)
+    cancellation_artifact = create_cancellation_artifact(
+        task_id, reason, category, attempts, cancelled_at=now_iso
+    )
     
     # Save cancellation artifact
     if cancellation_dir is None:
@@ -124,27 +175,9 @@ def cancel_datapoint(
     print(f"✓ Created cancellation artifact: {artifact_path}")
     
     # Update review CSV - only update the reviewed_at field to mark as processed
-    review_rows[review_index]['reviewed_at'] = datetime.now(timezone.utc).isoformat()
-    
     # Store cancellation details in the artifact instead of the CSV
     # since the CSV doesn't have fields for cancellation details
-    
-    # Write updated review CSV
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=review_csv_path.parent)
-    try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=review_fieldnames)
-            writer.writeheader()
-            writer.writerows(review_rows)
-        
-        # Replace original file
-        os.replace(temp_path, review_csv_path)
-        
-    except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        raise
+    mark_reviewed(review_csv_path, review_pos, task_id, now_iso)
     
     # Report success
     print(f"✓ Cancelled datapoint '{task_id}'")
@@ -155,26 +188,20 @@ def cancel_datapoint(
     
     # Complete the task in data_pipeline if requested
     if complete_task:
+        # Use review_task_id if provided, otherwise use task_id
+        task_to_complete = review_task_id if review_task_id else task_id
+        
         try:
-            # Get the path to data_pipeline.py relative to this script
-            script_dir = Path(__file__).parent
-            data_pipeline_path = script_dir.parent.parent / 'data_pipeline.py'
-            
-            # Use review_task_id if provided, otherwise use task_id
-            task_to_complete = review_task_id if review_task_id else task_id
-            
-            cmd = [
-                'python', str(data_pipeline_path),
-                'complete', task_to_complete,
-                '--status', 'cancelled',
-                '--artifact', str(artifact_path)
-            ]
+            from data_pipeline import DataPipeline
             
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            print(f"✓ Marked task '{task_to_complete}' as cancelled in data pipeline with artifact")
+            result = DataPipeline().cmd_complete(
+                task_to_complete, 'rejected', artifact_file=str(artifact_path)
+            )
+            if result.get('status') == 'success':
+                print(f"✓ Marked task '{task_to_complete}' as cancelled in data pipeline with artifact")
+            else:
+                print(f"⚠️  Warning: Failed to complete task in data pipeline: {result.get('message')}")
             
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️  Warning: Failed to complete task in data pipeline: {e.stderr}")
         except Exception as e:
             print(f"⚠️  Warning: Failed to complete task in data pipeline: {str(e)}")
     
@@ -8,123 +8,153 @@ from the CSV and formatting them into a readable markdown document.
 
 import argparse
 import csv
+import io
 import json
+import mmap
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
 
+# additional_files blobs larger than this are summarised instead of parsed
+MAX_RENDERED_ADDITIONAL_FILES_CHARS = 10 * 1024 * 1024
+
+# Code block language for each (lowercased) additional file extension
+EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.r': 'r',
+    '.js': 'javascript',
+    '.sh': 'bash',
+    '.dockerfile': 'dockerfile',
+    '.json': 'json',
+    '.yaml': 'yaml',
+    '.yml': 'yml',
+    '.xml': 'xml',
+    '.html': 'html',
+    '.css': 'css'
+}
+
 
 def read_datapoint(csv_path: str, task_id: str) -> dict:
     """Read a specific datapoint from CSV by task_id."""
-    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    # Cheap negative check: if the id never occurs in the raw bytes, the task
+    # cannot be in the CSV. A hit still needs the CSV parse below, since the id
+    # may only appear inside another datapoint's content.
+    with open(csv_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Task ID '{task_id}' not found in {csv_path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(task_id.encode('utf-8')) == -1:
+                raise ValueError(f"Task ID '{task_id}' not found in {csv_path}")
+    
+    with open(csv_path, 'r', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        task_id_index = fieldnames.index('task_id')
         for row in reader:
-            if row['task_id'] == task_id:
-                return row
+            if row and row[task_id_index] == task_id:
+                return dict(zip(fieldnames, row))
     raise ValueError(f"Task ID '{task_id}' not found in {csv_path}")
 
 
 def format_datapoint_markdown(datapoint: dict) -> str:
     """Format a datapoint dictionary as markdown."""
-    md_lines = []
+    # Each write starts with the newline that ends the previous line
+    buf = io.StringIO()
+    w = buf.write
     
     # Header
-    md_lines.append(f"# Datapoint: {datapoint['task_id']}")
-    md_lines.append("")
+    w(f"# Datapoint: {datapoint['task_id']}")
+    w("\n")
     
     # Status section
-    md_lines.append("## Status")
-    md_lines.append(f"- Task ID: {datapoint['task_id']}")
-    md_lines.append(f"- Difficulty: {datapoint.get('difficulty', 'Not specified')}")
+    w("\n## Status")
+    w(f"\n- Task ID: {datapoint['task_id']}")
+    w(f"\n- Difficulty: {datapoint.get('difficulty', 'Not specified')}")
     if 'created_at' in datapoint:
-        md_lines.append(f"- Created: {datapoint['created_at']}")
+        w(f"\n- Created: {datapoint['created_at']}")
     if 'updated_at' in datapoint:
-        md_lines.append(f"- Updated: {datapoint['updated_at']}")
-    md_lines.append("")
+        w(f"\n- Updated: {datapoint['updated_at']}")
+    w("\n")
     
     # Prompt
-    md_lines.append("## Prompt")
-    md_lines.append(datapoint.get('prompt', 'No prompt provided'))
-    md_lines.append("")
+    w("\n## Prompt\n")
+    w(datapoint.get('prompt', 'No prompt provided'))
+    w("\n")
     
     # Dockerfile
-    md_lines.append("## Dockerfile")
-    md_lines.append("```dockerfile")
-    md_lines.append(datapoint.get('dockerfile', 'No dockerfile provided'))
-    md_lines.append("```")
-    md_lines.append("")
+    w("\n## Dockerfile")
+    w("\n```dockerfile\n")
+    w(datapoint.get('dockerfile', 'No dockerfile provided'))
+    w("\n```")
+    w("\n")
     
     # Test Functions
-    md_lines.append("## Test Functions")
-    md_lines.append("```python")
-    md_lines.append(datapoint.get('test_functions', 'No tests provided'))
-    md_lines.append("```")
-    md_lines.append("")
+    w("\n## Test Functions")
+    w("\n```python\n")
+    w(datapoint.get('test_functions', 'No tests provided'))
+    w("\n```")
+    w("\n")
     
     # Test Weights
-    md_lines.append("## Test Weights")
+    w("\n## Test Weights")
     if 'test_weights' in datapoint and datapoint['test_weights']:
         try:
             weights = json.loads(datapoint['test_weights'])
             for test_name, weight in weights.items():
-                md_lines.append(f"- {test_name}: {weight}")
+                w(f"\n- {test_name}: {weight}")
         except json.JSONDecodeError:
-            md_lines.append(datapoint['test_weights'])
+            w("\n")
+            w(datapoint['test_weights'])
     else:
-        md_lines.append("No weights provided")
-    md_lines.append("")
+        w("\nNo weights provided")
+    w("\n")
     
     # Additional Files
     if 'additional_files' in datapoint and datapoint['additional_files']:
-        md_lines.append("## Additional Files")
-        try:
-            files = json.loads(datapoint['additional_files'])
-            for filename, content in files.items():
-                md_lines.append(f"### {filename}")
-                # Determine if we need code block based on file extension
-                ext = Path(filename).suffix.lower()
-                if ext in ['.py', '.r', '.R', '.js', '.sh', '.dockerfile']:
-                    lang = {
-                        '.py': 'python',
-                        '.r': 'r', '.R': 'r',
-                        '.js': 'javascript',
-                        '.sh': 'bash',
-                        '.dockerfile': 'dockerfile'
-                    }.get(ext, '')
-                    md_lines.append(f"```{lang}")
-                elif ext in ['.json', '.yaml', '.yml', '.xml', '.html', '.css']:
-                    lang = ext[1:]  # Remove the dot
-                    md_lines.append(f"```{lang}")
-                else:
-                    md_lines.append("```")
-                
-                # Truncate very long files for display
-                if len(content) > 1000:
-                    md_lines.append(content[:1000])
-                    md_lines.append(f"... [Truncated - {len(content)} total characters]")
-                else:
-                    md_lines.append(content)
-                md_lines.append("```")
-                md_lines.append("")
-        except json.JSONDecodeError:
-            md_lines.append("Error parsing additional files")
-            md_lines.append("")
+        w("\n## Additional Files")
+        if len(datapoint['additional_files']) > MAX_RENDERED_ADDITIONAL_FILES_CHARS:
+            # Files are truncated for display anyway, so don't parse huge blobs
+            w(f"\n[additional_files too large to render: {len(datapoint['additional_files'])} chars]")
+            w("\n")
+        else:
+            try:
+                files = json.loads(datapoint['additional_files'])
+                for filename, content in files.items():
+                    w(f"\n### {filename}")
+                    # Code block language based on file extension (plain block if unknown)
+                    lang = EXTENSION_LANGUAGES.get(Path(filename).suffix.lower(), '')
+                    w(f"\n```{lang}")
+                    
+                    # Truncate very long files for display
+                    w("\n")
+                    if len(content) > 1000:
+                        w(content[:1000])
+                        w(f"\n... [Truncated - {len(content)} total characters]")
+                    else:
+                        w(content)
+                    w("\n```")
+                    w("\n")
+            except json.JSONDecodeError:
+                w("\nError parsing additional files")
+                w("\n")
     
     # Validation results if present
     if 'validation_results' in datapoint and datapoint['validation_results']:
-        md_lines.append("## Validation Results")
+        w("\n## Validation Results")
         try:
             results = json.loads(datapoint['validation_results'])
-            md_lines.append(f"- Valid: {results.get('valid', 'Unknown')}")
+            w(f"\n- Valid: {results.get('valid', 'Unknown')}")
             if 'errors' in results and results['errors']:
-                md_lines.append("- Errors:")
+                w("\n- Errors:")
                 for error in results['errors']:
-                    md_lines.append(f"  - {error}")
+                    w(f"\n  - {error}")
         except json.JSONDecodeError:
-            md_lines.append(datapoint['validation_results'])
-        md_lines.append("")
+            w("\n")
+            w(datapoint['validation_results'])
+        w("\n")
     
-    return '\n'.join(md_lines)
+    return buf.getvalue()
 
 
 def main():
@@ -13,11 +13,10 @@ from pathlib import Path
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir.parent.parent))
 
-from shared_tools.categories_tags import VALID_CATEGORIES, VALID_TAGS
-
 
 def show_categories_and_tags():
     """Display all available categories and tags."""
+    from shared_tools.categories_tags import VALID_CATEGORIES, VALID_TAGS
     
     print("Available Categories (choose 1):")
     print("=" * 40)
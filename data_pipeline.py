@@ -5,45 +5,110 @@ Provides agent-friendly commands for managing datapoint generation tasks.
 """
 
 import argparse
+import errno
+import heapq
 import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import struct
 import sys
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
-from task_manager.task_manager import TaskManager, TaskStatus
+from task_manager.task_manager import TaskManager, TaskStatus, json_dumps, json_loads
 
 # Add task_manager to path
 sys.path.append(str(Path(__file__).parent.parent.parent / "task_manager"))
 
+# Unix socket a `--daemon` process listens on; the CLI forwards commands to it when present
+SOCKET_PATH = Path(__file__).parent / "state" / "pipeline.sock"
+# Seconds to wait for a daemon response before giving up on the command
+DAEMON_TIMEOUT_SECONDS = 30
 
 
 class DataPipeline:
     """Wrapper for task manager with data generation specific logic."""
     
+    # Artifact subdirectory per task type; anything else goes to final_dps
+    _SUBDIR = {
+        "seed_dp": "seed_dps",
+        "final_dp": "final_dps"
+    }
+    
     def __init__(self):
         self.state_file = Path(__file__).parent / "state" / "generation_state.json"
         self.artifacts_dir = Path(__file__).parent / "artifacts"
+        self._artifact_dirs = {t: self.artifacts_dir / sub for t, sub in self._SUBDIR.items()}
+        self._default_artifact_dir = self.artifacts_dir / "final_dps"
         self.tm = TaskManager(self.state_file)
+        # Parsed state, shared by the reads of one command; reset on writes
+        self._state_cache: Optional[Dict[str, Any]] = None
+        # (type, status) -> [(position, task_id)], built from the cached state
+        self._index_cache: Optional[Dict[Tuple[str, str], List[Tuple[int, str]]]] = None
+        # On-disk signature of the state files when the cache was loaded
+        self._cache_signature: Optional[Tuple] = None
         
         # Ensure artifact directories exist (no longer need draft_dps)
         for subdir in ["seed_dps", "final_dps"]:
             (self.artifacts_dir / subdir).mkdir(parents=True, exist_ok=True)
     
+    def _state(self) -> Dict[str, Any]:
+        """Return the parsed state, loading it at most once between writes."""
+        if self._state_cache is None:
+            # Take the signature first so a write racing the load is seen as a change
+            self._cache_signature = self._files_signature()
+            self._state_cache = self.tm._load_state()
+        return self._state_cache
+    
+    def _files_signature(self) -> Tuple:
+        """Cheap fingerprint of the snapshot and WAL; changes on every write."""
+        signature = []
+        for path in (self.state_file, self.tm.wal_file):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def refresh_state(self) -> None:
+        """Keep the cached state only if no other process has written since it was loaded."""
+        if self._state_cache is not None and self._cache_signature != self._files_signature():
+            self._invalidate_state()
+    
+    def _invalidate_state(self) -> None:
+        """Drop the cached state and index after a write."""
+        self._state_cache = None
+        self._index_cache = None
+    
+    def _task_index(self) -> Dict[Tuple[str, str], List[Tuple[int, str]]]:
+        """Index task IDs by (type, status), keeping each task's state order."""
+        if self._index_cache is None:
+            index: Dict[Tuple[str, str], List[Tuple[int, str]]] = {}
+            for position, (task_id, task) in enumerate(self._state()["tasks"].items()):
+                index.setdefault((task["type"], task["status"]), []).append((position, task_id))
+            self._index_cache = index
+        return self._index_cache
+    
+    def _get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Read-only task lookup against the cached state."""
+        task = self._state()["tasks"].get(task_id)
+        if task is None:
+            return None
+        return {"id": task_id, **task}
+    
     def get_artifact_path(self, task_id: str, task_type: str) -> Path:
         """Get the artifact path for a given task."""
-        type_to_dir = {
-            "seed_dp": "seed_dps",
-            "final_dp": "final_dps"
-        }
-        subdir = type_to_dir.get(task_type, "final_dps")
-        
         # Draft DPs no longer use artifacts - they're in shared workspace
         if task_type == "draft_dp":
             # Return path to shared workspace draft spec
             return Path("shared_workspace/data_points") / task_id / "draft_spec.md"
         
         # Default to JSON for backward compatibility
-        return self.artifacts_dir / subdir / f"{task_id}.json"
+        return self._artifact_dirs.get(task_type, self._default_artifact_dir) / f"{task_id}.json"
     
     def cmd_next(self, task_type: Optional[str] = None) -> Dict[str, Any]:
         """Get next available task."""
@@ -51,6 +116,7 @@ class DataPipeline:
         agent_id = f"{task_type}_agent" if task_type else "default_agent"
         task_types = [task_type] if task_type else None
         task = self.tm.get_next_task(agent_id, task_types)
+        self._invalidate_state()
         
         if not task:
             return {"status": "no_tasks", "message": "No available tasks"}
@@ -77,7 +143,7 @@ class DataPipeline:
             return {"status": "error", "message": f"Invalid status: {status}"}
         
         # Get task info before completing
-        task = self.tm.get_task(task_id)
+        task = self._get_task(task_id)
         if not task:
             return {"status": "error", "message": f"Task {task_id} not found"}
         
@@ -86,10 +152,15 @@ class DataPipeline:
         
         # Save artifact if provided
         result_data = {}
-        if artifact_file and Path(artifact_file).exists():
+        artifact_content = None
+        if artifact_file:
+            try:
+                artifact_content = Path(artifact_file).read_bytes()
+            except FileNotFoundError:
+                pass
+        if artifact_content is not None:
             artifact_path = self.get_artifact_path(task_id, task["type"])
-            artifact_content = Path(artifact_file).read_text()
-            artifact_path.write_text(artifact_content)
+            artifact_path.write_bytes(artifact_content)
             result_data["artifact_saved"] = str(artifact_path)
         
         # Complete the task
@@ -99,6 +170,7 @@ class DataPipeline:
             status=status_map[status],
             result_data=result_data
         )
+        self._invalidate_state()
         
         if success:
             return {"status": "success", "message": f"Task {task_id} marked as {status}"}
@@ -108,12 +180,13 @@ class DataPipeline:
     def cmd_release(self, task_id: str) -> Dict[str, Any]:
         """Release a task back to pending."""
         # Get task to find who locked it
-        task = self.tm.get_task(task_id)
+        task = self._get_task(task_id)
         if not task:
             return {"status": "error", "message": f"Task {task_id} not found"}
         
         agent_id = task.get("locked_by", "unknown")
         success = self.tm.release_task(task_id, agent_id)
+        self._invalidate_state()
         
         if success:
             return {"status": "success", "message": f"Task {task_id} released"}
@@ -128,6 +201,7 @@ class DataPipeline:
             data=data,
             parent_id=parent_id
         )
+        self._invalidate_state()
         
         return {
             "status": "success",
@@ -135,21 +209,47 @@ class DataPipeline:
             "message": f"Created task {task_id}"
         }
     
+    def cmd_batch(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several task commands in a single invocation.
+        
+        Each op is a dict with an "op" key naming the command (complete, release
+        or create-task) plus that command's arguments. Every op is attempted and
+        the per-op results are returned in order.
+        """
+        results = []
+        for op in ops:
+            name = op.get("op")
+            try:
+                if name == "complete":
+                    result = self.cmd_complete(op["task_id"], op["status"], op.get("artifact"))
+                elif name == "release":
+                    result = self.cmd_release(op["task_id"])
+                elif name == "create-task":
+                    result = self.cmd_create_task(op["type"], op.get("parent"), op.get("data", {}))
+                else:
+                    result = {"status": "error", "message": f"Unsupported batch op: {name}"}
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            results.append(result)
+        
+        all_succeeded = all(result.get("status") == "success" for result in results)
+        return {
+            "status": "success" if all_succeeded else "error",
+            "results": results
+        }
+    
     def cmd_status(self) -> Dict[str, Any]:
         """Get workflow status summary."""
-        summary = self.tm.get_status_summary()
+        state = self._state()
+        summary = self.tm.get_status_summary(state)
         
         # Add completion rates
         if summary["type_counts"]:
+            index = self._task_index()
+            
             for task_type in summary["type_counts"]:
                 total = summary["type_counts"][task_type]
-                completed = 0
-                
-                # Count completed tasks of this type
-                state = self.tm._load_state()
-                for task in state["tasks"].values():
-                    if task["type"] == task_type and task["status"] == "completed":
-                        completed += 1
+                completed = len(index.get((task_type, "completed"), ()))
                 
                 summary[f"{task_type}_completion_rate"] = f"{completed}/{total} ({completed/total*100:.1f}%)"
         
@@ -157,7 +257,7 @@ class DataPipeline:
     
     def cmd_info(self, task_id: str) -> Dict[str, Any]:
         """Get detailed information about a task."""
-        task = self.tm.get_task(task_id)
+        task = self._get_task(task_id)
         
         if not task:
             return {"status": "error", "message": f"Task {task_id} not found"}
@@ -166,25 +266,34 @@ class DataPipeline:
         task["artifact_path"] = str(self.get_artifact_path(task_id, task["type"]))
         
         # Add children info
-        children = self.tm.get_task_children(task_id)
-        task["children_count"] = len(children)
-        task["children_ids"] = [child["id"] for child in children]
+        children_ids = [
+            child_id for child_id, child in self._state()["tasks"].items()
+            if child["parent_id"] == task_id
+        ]
+        task["children_count"] = len(children_ids)
+        task["children_ids"] = children_ids
         
         return task
     
     def cmd_list(self, task_type: Optional[str] = None, 
                  status: Optional[str] = None) -> Dict[str, Any]:
         """List tasks with optional filters."""
-        state = self.tm._load_state()
+        state = self._state()
         tasks = []
         
-        for task_id, task in state["tasks"].items():
-            # Apply filters
-            if task_type and task["type"] != task_type:
-                continue
-            if status and task["status"] != status:
-                continue
-            
+        if task_type or status:
+            # Pick the matching (type, status) buckets and merge them back
+            # into state order
+            buckets = [
+                ids for (t, s), ids in self._task_index().items()
+                if (not task_type or t == task_type) and (not status or s == status)
+            ]
+            task_ids = [task_id for _, task_id in heapq.merge(*buckets)]
+        else:
+            task_ids = list(state["tasks"])
+        
+        for task_id in task_ids:
+            task = state["tasks"][task_id]
             tasks.append({
                 "id": task_id,
                 "type": task["type"],
@@ -199,9 +308,18 @@ class DataPipeline:
             "tasks": tasks
         }
     
+    def cmd_compact(self) -> Dict[str, Any]:
+        """Fold the state WAL into the snapshot file."""
+        wal_bytes = self.tm.compact()
+        self._invalidate_state()
+        return {
+            "status": "success",
+            "message": f"Compacted {wal_bytes} bytes of WAL into {self.state_file.name}"
+        }
+    
     def cmd_get_artifact(self, task_id: str) -> str:
         """Get artifact content for a task."""
-        task = self.tm.get_task(task_id)
+        task = self._get_task(task_id)
         
         if not task:
             return f"Error: Task {task_id} not found"
@@ -226,26 +344,29 @@ class DataPipeline:
             else:
                 return f"Error: No artifact found for task {task_id}"
     
-    def cmd_save_artifact(self, task_id: str, file_path: str) -> Dict[str, Any]:
-        """Save artifact for a task."""
-        task = self.tm.get_task(task_id)
+    def cmd_save_artifact(self, task_id: str, file_path: str,
+                          validate: bool = True) -> Dict[str, Any]:
+        """Save artifact for a task, checking it parses as JSON unless validate is False."""
+        task = self._get_task(task_id)
         
         if not task:
             return {"status": "error", "message": f"Task {task_id} not found"}
         
-        if not Path(file_path).exists():
+        try:
+            content = Path(file_path).read_bytes()
+        except FileNotFoundError:
             return {"status": "error", "message": f"File {file_path} not found"}
         
         artifact_path = self.get_artifact_path(task_id, task["type"])
-        content = Path(file_path).read_text()
         
         # Validate JSON
-        try:
-            json.loads(content)
-        except json.JSONDecodeError as e:
-            return {"status": "error", "message": f"Invalid JSON: {e}"}
+        if validate:
+            try:
+                json_loads(content)
+            except json.JSONDecodeError as e:
+                return {"status": "error", "message": f"Invalid JSON: {e}"}
         
-        artifact_path.write_text(content)
+        artifact_path.write_bytes(content)
         
         return {
             "status": "success",
@@ -254,7 +375,7 @@ class DataPipeline:
     
     def cmd_add_artifact(self, task_id: str, file_path: str) -> Dict[str, Any]:
         """Add artifact file for a task (no longer used for draft_dp)."""
-        task = self.tm.get_task(task_id)
+        task = self._get_task(task_id)
         
         if not task:
             return {"status": "error", "message": f"Task {task_id} not found"}
@@ -271,21 +392,23 @@ class DataPipeline:
         
         # Determine artifact path based on file extension
         input_path = Path(file_path)
-        artifact_dir = self.artifacts_dir / {
-            "seed_dp": "seed_dps",
-            "final_dp": "final_dps"
-        }.get(task["type"], "final_dps")
+        artifact_dir = self._artifact_dirs.get(task["type"], self._default_artifact_dir)
         
         # Keep the original file extension
         artifact_path = artifact_dir / f"{task_id}{input_path.suffix}"
         
-        # Move file to artifacts directory
-        import shutil
-        shutil.move(str(input_path), str(artifact_path))
+        # Move file to artifacts directory, copying only across filesystems
+        try:
+            os.replace(input_path, artifact_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(input_path), str(artifact_path))
         
         # Update task data with artifact info
         update_data = {"artifact_path": str(artifact_path), "artifact_added": True}
         self.tm.update_task_data(task_id, update_data)
+        self._invalidate_state()
         
         return {
             "status": "success",
@@ -294,8 +417,151 @@ class DataPipeline:
         }
 
 
+def run_command(pipeline: DataPipeline, args: argparse.Namespace) -> Any:
+    """Run one parsed CLI command and return its result."""
+    if args.command == "next":
+        return pipeline.cmd_next(args.task_type)
+    elif args.command == "complete":
+        return pipeline.cmd_complete(args.task_id, args.status, args.artifact)
+    elif args.command == "release":
+        return pipeline.cmd_release(args.task_id)
+    elif args.command == "create-task":
+        data = json.loads(args.data)
+        return pipeline.cmd_create_task(args.type, args.parent, data)
+    elif args.command == "batch":
+        ops = json.loads(args.ops)
+        return pipeline.cmd_batch(ops)
+    elif args.command == "status":
+        return pipeline.cmd_status()
+    elif args.command == "info":
+        return pipeline.cmd_info(args.task_id)
+    elif args.command == "list":
+        return pipeline.cmd_list(args.type, args.status)
+    elif args.command == "compact":
+        return pipeline.cmd_compact()
+    elif args.command == "get-artifact":
+        return pipeline.cmd_get_artifact(args.task_id)
+    elif args.command == "save-artifact":
+        return pipeline.cmd_save_artifact(args.task_id, args.file, not args.no_validate)
+    elif args.command == "add-artifact":
+        return pipeline.cmd_add_artifact(args.task_id, args.file)
+    else:
+        raise ValueError(f"Unknown command: {args.command}")
+
+
+def _send_frame(sock: socket.socket, obj: Any) -> None:
+    """Send obj as a 4-byte length-prefixed JSON frame."""
+    payload = json.dumps(obj).encode('utf-8')
+    sock.sendall(struct.pack('>I', len(payload)) + payload)
+
+
+def _recv_frame(sock: socket.socket) -> Any:
+    """Read one length-prefixed JSON frame."""
+    def recv_exact(n: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("Connection closed mid-frame")
+            buf += chunk
+        return bytes(buf)
+    
+    (length,) = struct.unpack('>I', recv_exact(4))
+    return json.loads(recv_exact(length))
+
+
+class _DaemonHandler(socketserver.BaseRequestHandler):
+    """Runs one forwarded CLI command per connection."""
+    
+    def handle(self):
+        try:
+            request = _recv_frame(self.request)
+        except ConnectionError:
+            # Liveness probe from another `--daemon` start, or a client that gave up
+            return
+        pipeline = self.server.pipeline
+        try:
+            # Relative paths in the command are relative to the client
+            os.chdir(request["cwd"])
+            pipeline.refresh_state()
+            result = run_command(pipeline, argparse.Namespace(**request["args"]))
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            # A failed command may have written part of its changes
+            pipeline._invalidate_state()
+            response = {"ok": False, "message": str(e)}
+        _send_frame(self.request, response)
+
+
+def serve(pipeline: DataPipeline) -> None:
+    """Serve CLI commands over SOCKET_PATH until interrupted.
+    
+    Commands run one at a time against a single long-lived DataPipeline, so
+    the parsed state is reused until another process writes to it.
+    """
+    if SOCKET_PATH.exists():
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(str(SOCKET_PATH))
+            print(f"Error: a daemon is already listening on {SOCKET_PATH}")
+            sys.exit(1)
+        except ConnectionRefusedError:
+            # Left behind by a daemon that didn't shut down cleanly
+            SOCKET_PATH.unlink()
+    
+    with socketserver.UnixStreamServer(str(SOCKET_PATH), _DaemonHandler) as server:
+        server.pipeline = pipeline
+        # Exit through the finally below on SIGTERM too, so the socket is removed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        print(f"Serving data pipeline commands on {SOCKET_PATH}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            SOCKET_PATH.unlink(missing_ok=True)
+
+
+def send_to_daemon(args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    """Forward a command to the daemon; None if no daemon is listening.
+    
+    Only a failed connect means "no daemon", and lets the caller run the
+    command in-process. Once the request may have reached the daemon, a
+    timeout (after DAEMON_TIMEOUT_SECONDS) or dropped connection raises
+    RuntimeError instead: the daemon may still run the command, and running
+    it again here would claim or create tasks twice.
+    """
+    if not SOCKET_PATH.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(DAEMON_TIMEOUT_SECONDS)
+    try:
+        try:
+            sock.connect(str(SOCKET_PATH))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return None
+        try:
+            _send_frame(sock, {"cwd": os.getcwd(), "args": vars(args)})
+            return _recv_frame(sock)
+        except OSError as e:
+            raise RuntimeError(
+                f"No response from pipeline daemon ({e!r}); the command may or may not have run"
+            ) from e
+    finally:
+        sock.close()
+
+
+def print_json(result: Any) -> None:
+    """Write result to stdout as indented JSON, encoded straight to bytes."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(json_dumps(result, indent=True) + b'\n')
+    sys.stdout.buffer.flush()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Data Pipeline CLI for DP generation workflow")
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Serve commands over {SOCKET_PATH} instead of running one")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
     # next command
@@ -320,6 +586,11 @@ def main():
     create_parser.add_argument("--parent", help="Parent task ID")
     create_parser.add_argument("--data", required=True, help="Task data as JSON string")
     
+    # batch command
+    batch_parser = subparsers.add_parser("batch", help="Run several commands in one invocation")
+    batch_parser.add_argument("--ops", required=True,
+                              help='JSON array of operations, e.g. [{"op": "complete", "task_id": "...", "status": "completed"}]')
+    
     # status command
     subparsers.add_parser("status", help="Show workflow status")
     
@@ -332,6 +603,9 @@ def main():
     list_parser.add_argument("--type", help="Filter by task type")
     list_parser.add_argument("--status", help="Filter by status")
     
+    # compact command
+    subparsers.add_parser("compact", help="Fold the state WAL into the snapshot file")
+    
     # get-artifact command
     get_artifact_parser = subparsers.add_parser("get-artifact", help="Get task artifact")
     get_artifact_parser.add_argument("task_id", help="Task ID")
@@ -340,6 +614,8 @@ def main():
     save_artifact_parser = subparsers.add_parser("save-artifact", help="Save task artifact")
     save_artifact_parser.add_argument("task_id", help="Task ID")
     save_artifact_parser.add_argument("--file", required=True, help="Path to artifact file")
+    save_artifact_parser.add_argument("--no-validate", action="store_true",
+                                      help="Skip the JSON check (for files written by a trusted generator)")
     
     # add-artifact command
     add_artifact_parser = subparsers.add_parser("add-artifact", help="Add artifact file for a task")
@@ -348,49 +624,35 @@ def main():
     
     args = parser.parse_args()
     
+    if args.daemon:
+        serve(DataPipeline())
+        return
+    
     if not args.command:
         parser.print_help()
         sys.exit(1)
     
-    # Initialize pipeline
-    pipeline = DataPipeline()
-    
-    # Execute command
+    # Execute command, in the daemon if one is running
     try:
-        if args.command == "next":
-            result = pipeline.cmd_next(args.task_type)
-        elif args.command == "complete":
-            result = pipeline.cmd_complete(args.task_id, args.status, args.artifact)
-        elif args.command == "release":
-            result = pipeline.cmd_release(args.task_id)
-        elif args.command == "create-task":
-            data = json.loads(args.data)
-            result = pipeline.cmd_create_task(args.type, args.parent, data)
-        elif args.command == "status":
-            result = pipeline.cmd_status()
-        elif args.command == "info":
-            result = pipeline.cmd_info(args.task_id)
-        elif args.command == "list":
-            result = pipeline.cmd_list(args.type, args.status)
-        elif args.command == "get-artifact":
-            result = pipeline.cmd_get_artifact(args.task_id)
+        response = send_to_daemon(args)
+        if response is None:
+            result = run_command(DataPipeline(), args)
+        elif response["ok"]:
+            result = response["result"]
+        else:
+            raise RuntimeError(response["message"])
+        
+        if args.command == "get-artifact":
             # Since cmd_get_artifact now returns a string, print it directly
             print(result)
             return
-        elif args.command == "save-artifact":
-            result = pipeline.cmd_save_artifact(args.task_id, args.file)
-        elif args.command == "add-artifact":
-            result = pipeline.cmd_add_artifact(args.task_id, args.file)
-        else:
-            print(f"Unknown command: {args.command}")
-            sys.exit(1)
         
         # Output result as JSON
-        print(json.dumps(result, indent=2))
+        print_json(result)
         
     except Exception as e:
         error_result = {"status": "error", "message": str(e)}
-        print(json.dumps(error_result, indent=2))
+        print_json(error_result)
         sys.exit(1)
 
 
@@ -3,7 +3,10 @@ Initialize seed_dp tasks from eval_tasks directory.
 Extracts task information and creates tasks in the task manager.
 """
 
+import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from task_manager.task_manager import TaskManager
@@ -12,13 +15,22 @@ from task_manager.task_manager import TaskManager
 sys.path.append(str(Path(__file__).parent))
 sys.path.append(str(Path(__file__).parent.parent.parent / "task_manager"))
 
+# Whole lines carrying the benchmark canary, including their newline
+CANARY_LINE_RE = re.compile(r'^.*(?:BENCHMARK DATA SHOULD NEVER APPEAR|terminal-bench-canary).*\n?', re.MULTILINE)
+# Runs of two or more blank lines
+BLANK_RUN_RE = re.compile(r'\n{3,}')
 
 
 def read_file(filepath):
     """Read and return file contents."""
     try:
-        with open(filepath, 'r') as f:
-            return f.read()
+        # One binary read and a single decode skip the text-mode wrapper
+        with open(filepath, 'rb') as f:
+            content = f.read().decode('utf-8')
+        # Match text mode's universal newline handling
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
     except FileNotFoundError:
         return None
     except Exception as e:
@@ -37,15 +49,7 @@ def clean_content(content, file_type):
             content = content[from_index:]
         else:
             # If no FROM found, try to clean manually
-            lines = content.split('\n')
-            cleaned_lines = []
-            for line in lines:
-                if "BENCHMARK DATA SHOULD NEVER APPEAR" in line:
-                    continue
-                if "terminal-bench-canary" in line:
-                    continue
-                cleaned_lines.append(line)
-            content = '\n'.join(cleaned_lines)
+            content = CANARY_LINE_RE.sub('', content)
     
     # For task.yaml files, start from "instruction:"
     elif file_type == "task_yaml":
@@ -55,16 +59,11 @@ def clean_content(content, file_type):
     
     # For test files, remove canary lines and template comments
     elif file_type == "test":
-        lines = content.split('\n')
+        lines = CANARY_LINE_RE.sub('', content).split('\n')
         cleaned_lines = []
         skip_template = False
         
-        for i, line in enumerate(lines):
-            if "BENCHMARK DATA SHOULD NEVER APPEAR" in line:
-                continue
-            if "terminal-bench-canary" in line:
-                continue
-            
+        for line in lines:
             # Skip the template comment block
             if "This is a template test file" in line:
                 skip_template = True
@@ -79,8 +78,7 @@ def clean_content(content, file_type):
         content = '\n'.join(cleaned_lines)
     
     # Remove multiple consecutive blank lines
-    while '\n\n\n' in content:
-        content = content.replace('\n\n\n', '\n\n')
+    content = BLANK_RUN_RE.sub('\n\n', content)
     
     # Remove leading/trailing whitespace
     content = content.strip()
@@ -142,31 +140,32 @@ def main():
         print(f"Error: tasks directory not found at {eval_tasks_dir}")
         sys.exit(1)
     
-    # Get all task directories
-    task_dirs = [d for d in eval_tasks_dir.iterdir() if d.is_dir()]
+    # Get all task directories; scandir's entries know their type without a stat
+    with os.scandir(eval_tasks_dir) as entries:
+        task_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
     task_dirs.sort()  # Sort for consistent ordering
     
     print(f"Found {len(task_dirs)} tasks in eval_tasks directory")
     
     # Create seed_dp tasks
-    created_count = 0
-    for task_dir in task_dirs:
+    # Reading the task directories is I/O bound, so extract them on a
+    # thread pool; the tasks are then created with a single state write
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        futures = [executor.submit(extract_task_data, task_dir) for task_dir in task_dirs]
+    
+    extracted = []
+    for task_dir, future in zip(task_dirs, futures):
         try:
             # Extract task data
-            task_data = extract_task_data(task_dir)
-            
-            # Create task
-            task_id = tm.create_task(
-                task_type="seed_dp",
-                data=task_data
-            )
-            
-            print(f"Created task {task_id} for {task_dir.name}")
-            created_count += 1
-            
+            extracted.append((task_dir, future.result()))
         except Exception as e:
             print(f"Error processing {task_dir.name}: {e}")
     
+    task_ids = tm.create_tasks_bulk([("seed_dp", task_data, None) for _, task_data in extracted])
+    for (task_dir, _), task_id in zip(extracted, task_ids):
+        print(f"Created task {task_id} for {task_dir.name}")
+    created_count = len(task_ids)
+    
     print(f"\nInitialization complete: created {created_count} seed_dp tasks")
     
     # Show status
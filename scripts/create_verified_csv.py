@@ -17,29 +17,220 @@ Prerequisites:
 
 import argparse
 import csv
+import io
+import mmap
+import multiprocessing
+import os
+import shutil
 import sys
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
-from typing import Set
+from typing import FrozenSet, List, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from task_manager.task_manager import TaskManager, TaskStatus
 
+# Rows filtered per batch; bounds memory while keeping the hot loop tight
+CHUNK_ROWS = 10_000
+# Bytes of input per process-pool task when filtering large files in parallel
+PARALLEL_CHUNK_BYTES = 64 * 1024 * 1024
 
-def get_completed_task_ids(state_file: Path) -> Set[str]:
+
+def get_completed_task_ids(state_file: Path) -> FrozenSet[str]:
     """Extract all completed task IDs from the task manager state."""
     tm = TaskManager(state_file)
     state = tm._load_state()
     
-    completed_ids = set()
-    for task_id, task in state["tasks"].items():
-        if task["status"] == TaskStatus.COMPLETED.value:
-            # Extract the original task_id from validation task ID
-            if task_id.startswith("validate_"):
-                original_id = task["data"]["original_task_id"]
-                completed_ids.add(original_id)
+    # Map completed validation tasks back to the original task_id
+    return frozenset(
+        sys.intern(task["data"]["original_task_id"])
+        for task_id, task in state["tasks"].items()
+        if task_id.startswith("validate_") and task["status"] == TaskStatus.COMPLETED.value
+    )
+
+
+def filter_rows(reader, task_id_idx: int, completed_ids: FrozenSet[str],
+                writer=None, preview_ids: Optional[List[str]] = None) -> Tuple[int, int]:
+    """Write the verified rows from reader to writer (or collect preview IDs).
+    
+    Returns:
+        (total_rows, verified_count)
+    """
+    total_rows = 0
+    verified_count = 0
+    
+    # Filter in chunks so the membership test runs in a comprehension
+    # and the writes go through a single writerows call per chunk
+    while True:
+        chunk = list(islice(reader, CHUNK_ROWS))
+        if not chunk:
+            break
+        # Blank records are skipped, but only after the end-of-input check:
+        # a chunk of nothing but blank lines must not end the scan
+        chunk = [row for row in chunk if row]
+        total_rows += len(chunk)
+        
+        verified = [
+            row for row in chunk
+            if task_id_idx < len(row) and row[task_id_idx] in completed_ids
+        ]
+        verified_count += len(verified)
+        if writer is not None:
+            writer.writerows(verified)
+        elif preview_ids is not None and len(preview_ids) < 10:
+            preview_ids.extend(row[task_id_idx] for row in verified[:10 - len(preview_ids)])
+    
+    return total_rows, verified_count
+
+
+def find_record_end(mm: mmap.mmap, pos: int, quotes_before: int) -> int:
+    """Return the offset just past the first record-ending newline at or after pos.
     
-    return completed_ids
+    A newline ends a record only outside a quoted field, i.e. when the number
+    of quote characters before it is even (escaped quotes come in pairs).
+    """
+    in_quotes = quotes_before % 2 == 1
+    while True:
+        newline = mm.find(b'\n', pos)
+        if newline == -1:
+            return len(mm)
+        in_quotes ^= mm[pos:newline].count(b'"') % 2 == 1
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+
+def split_records(input_csv: Path, num_chunks: int) -> List[int]:
+    """Split a CSV into byte ranges that start and end on record boundaries.
+    
+    Returns:
+        Offsets [header_end, ..., file_size]; consecutive pairs are chunks
+    """
+    with open(input_csv, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        offsets = [find_record_end(mm, 0, 0)]
+        quotes = mm[:offsets[0]].count(b'"')
+        counted_to = offsets[0]
+        
+        for i in range(1, num_chunks):
+            target = max(size * i // num_chunks, offsets[-1])
+            quotes += mm[counted_to:target].count(b'"')
+            counted_to = target
+            boundary = find_record_end(mm, target, quotes)
+            if boundary >= size:
+                break
+            if boundary > offsets[-1]:
+                offsets.append(boundary)
+        
+        offsets.append(size)
+    return offsets
+
+
+# Per-worker state, set once by init_worker rather than pickled per chunk
+_worker_completed_ids: FrozenSet[str] = frozenset()
+_worker_task_id_idx = 0
+
+
+def init_worker(completed_ids: FrozenSet[str], task_id_idx: int):
+    global _worker_completed_ids, _worker_task_id_idx
+    _worker_completed_ids = completed_ids
+    _worker_task_id_idx = task_id_idx
+
+
+def filter_chunk(args: Tuple[Path, int, int, Optional[str]]) -> Tuple[Optional[str], int, int, List[str]]:
+    """Filter one byte range of the input, writing matches to part_path."""
+    input_csv, start, end, part_path = args
+    with open(input_csv, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Text-mode wrapper for the same universal newline handling as open()
+    reader = csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'))
+    
+    preview_ids: List[str] = []
+    if part_path is None:
+        total_rows, verified_count = filter_rows(
+            reader, _worker_task_id_idx, _worker_completed_ids, preview_ids=preview_ids
+        )
+    else:
+        with open(part_path, 'w', encoding='utf-8', newline='', buffering=8 * 1024 * 1024) as out:
+            total_rows, verified_count = filter_rows(
+                reader, _worker_task_id_idx, _worker_completed_ids, writer=csv.writer(out)
+            )
+    return part_path, total_rows, verified_count, preview_ids
+
+
+def filter_parallel(input_csv: Path, output_csv: Path, completed_ids: FrozenSet[str],
+                    dry_run: bool) -> Tuple[int, int, List[str]]:
+    """Filter the CSV on a process pool, one record-aligned byte range per task."""
+    size = input_csv.stat().st_size
+    offsets = split_records(input_csv, max(1, size // PARALLEL_CHUNK_BYTES))
+    
+    with open(input_csv, 'rb') as f:
+        header_bytes = f.read(offsets[0])
+    headers = next(csv.reader(io.TextIOWrapper(io.BytesIO(header_bytes), encoding='utf-8')), [])
+    task_id_idx = headers.index('task_id')
+    
+    jobs = []
+    for i, (start, end) in enumerate(zip(offsets, offsets[1:])):
+        part_path = None if dry_run else f"{output_csv}.part{i}"
+        jobs.append((input_csv, start, end, part_path))
+    
+    total_rows = 0
+    verified_count = 0
+    preview_ids: List[str] = []
+    try:
+        with ExitStack() as stack:
+            out = None
+            if not dry_run:
+                out = stack.enter_context(open(output_csv, 'w', encoding='utf-8', newline=''))
+                csv.writer(out).writerow(headers)
+                out.flush()
+            
+            pool = stack.enter_context(multiprocessing.Pool(
+                initializer=init_worker, initargs=(completed_ids, task_id_idx)
+            ))
+            # imap hands results back in input order, so parts are appended in order
+            for part_path, rows, verified, ids in pool.imap(filter_chunk, jobs):
+                total_rows += rows
+                verified_count += verified
+                if len(preview_ids) < 10:
+                    preview_ids.extend(ids[:10 - len(preview_ids)])
+                if part_path is not None:
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, out.buffer, 16 * 1024 * 1024)
+                    os.unlink(part_path)
+    finally:
+        for _, _, _, part_path in jobs:
+            if part_path is not None and os.path.exists(part_path):
+                os.unlink(part_path)
+    
+    return total_rows, verified_count, preview_ids
+
+
+def filter_serial(input_csv: Path, output_csv: Path, completed_ids: FrozenSet[str],
+                  dry_run: bool) -> Tuple[int, int, List[str]]:
+    """Stream matching rows straight to the output instead of buffering them."""
+    preview_ids: List[str] = []
+    
+    with ExitStack() as stack:
+        f = stack.enter_context(open(input_csv, 'r', encoding='utf-8', buffering=1 << 20))
+        reader = csv.reader(f)
+        # Work on raw row lists with a precomputed column index rather
+        # than building a dict per row
+        headers = next(reader, [])
+        task_id_idx = headers.index('task_id')
+        
+        writer = None
+        if not dry_run:
+            out = stack.enter_context(open(output_csv, 'w', encoding='utf-8', newline='', buffering=8 * 1024 * 1024))
+            writer = csv.writer(out)
+            writer.writerow(headers)
+        
+        total_rows, verified_count = filter_rows(reader, task_id_idx, completed_ids, writer, preview_ids)
+    
+    return total_rows, verified_count, preview_ids
 
 
 def create_verified_csv(input_csv: Path, output_csv: Path, state_file: Path, dry_run: bool = False):
@@ -48,40 +239,24 @@ def create_verified_csv(input_csv: Path, output_csv: Path, state_file: Path, dry
     completed_ids = get_completed_task_ids(state_file)
     print(f"Found {len(completed_ids)} completed validations")
     
-    # Read input CSV and filter
-    verified_rows = []
-    total_rows = 0
-    
-    with open(input_csv, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-        
-        for row in reader:
-            total_rows += 1
-            task_id = row.get('task_id')
-            
-            if task_id in completed_ids:
-                verified_rows.append(row)
+    # Large inputs are split across cores; small ones aren't worth the pool
+    if input_csv.stat().st_size >= 2 * PARALLEL_CHUNK_BYTES and (os.cpu_count() or 1) > 1:
+        total_rows, verified_count, preview_ids = filter_parallel(input_csv, output_csv, completed_ids, dry_run)
+    else:
+        total_rows, verified_count, preview_ids = filter_serial(input_csv, output_csv, completed_ids, dry_run)
     
     print(f"Total rows in input CSV: {total_rows}")
-    print(f"Verified rows to include: {len(verified_rows)}")
+    print(f"Verified rows to include: {verified_count}")
     
     if dry_run:
         print("\nDRY RUN - Would write the following verified task IDs:")
-        for i, row in enumerate(verified_rows[:10]):
-            print(f"  {row['task_id']}")
-        if len(verified_rows) > 10:
-            print(f"  ... and {len(verified_rows) - 10} more")
+        for task_id in preview_ids:
+            print(f"  {task_id}")
+        if verified_count > 10:
+            print(f"  ... and {verified_count - 10} more")
         print(f"\nOutput would be written to: {output_csv}")
     else:
-        # Write output CSV
-        with open(output_csv, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(verified_rows)
-        
-        print(f"\nWrote {len(verified_rows)} verified rows to {output_csv}")
-
+        print(f"\nWrote {verified_count} verified rows to {output_csv}")
 
 def main():
     parser = argparse.ArgumentParser(
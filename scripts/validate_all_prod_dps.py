@@ -17,12 +17,20 @@ read by create_verified_csv.py to produce the final verified dataset.
 """
 
 import argparse
+import contextlib
 import csv
-import subprocess
+import io
+import itertools
+import os
+import queue
+import signal
 import sys
+import threading
+import time
 import traceback
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 import multiprocessing
 
@@ -32,6 +40,32 @@ from task_manager.task_manager import TaskManager, TaskStatus
 
 
 TIMEOUT_MINUTES = 10
+# Validation tasks created per state write during init
+CREATE_BATCH_SIZE = 500
+# Agent that claims and completes tasks on behalf of queue-fed workers
+DISPATCHER_ID = "dispatcher"
+# Worker results written back per state write, and the longest one may wait
+RESULT_BATCH_SIZE = 50
+RESULT_FLUSH_SECONDS = 30
+# CSVs at least this large have their task IDs read on a process pool during init
+INIT_PARALLEL_MIN_BYTES = 128 * 1024 * 1024
+# Datapoints handed to a worker at a time. Each batch costs one CSV scan
+# instead of one per datapoint; larger batches stop paying off once that
+# scan is small next to a validation, and only unbalance the final batches
+DEFAULT_BATCH_SIZE = 4
+
+
+class ValidationTimeout(BaseException):
+    """Raised from SIGALRM when a validation runs past TIMEOUT_MINUTES.
+    
+    A BaseException, like KeyboardInterrupt, so the validators' own
+    ``except Exception`` handlers can't turn a timeout into an ordinary failure.
+    """
+
+
+def _raise_timeout(signum, frame):
+    raise ValidationTimeout()
+
 
 class DatapointValidator:
     """Handles validation of individual datapoints."""
@@ -39,45 +73,40 @@ class DatapointValidator:
     def __init__(self, csv_path: Path, verbose: bool = True):
         self.csv_path = csv_path
         self.verbose = verbose
-        self.validate_script = Path(__file__).parent / "validate_datapoint.py"
-    
-    def validate(self, task_id: str) -> Dict[str, Any]:
-        """Run validation for a specific task ID."""
-        cmd = [
-            sys.executable,
-            str(self.validate_script),
-            "--task-id", task_id,
-            "--csv-path", str(self.csv_path)
-        ]
-        
-        if self.verbose:
-            cmd.append("--verbose")
+        # The validators take the path as a string; convert it once
+        self._csv_path_str = str(csv_path)
+        # Validation runs in this process, so the validators are imported once per worker
+        from shared_tools.validate_datapoint import (
+            load_datapoints, validate_datapoint, validate_task, print_validation_results
+        )
+        self._load_datapoints = load_datapoints
+        self._validate_datapoint = validate_datapoint
+        self._validate_task = validate_task
+        self._print_results = print_validation_results
+    
+    def load(self, task_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        """Read the CSV rows for a batch of task IDs in one pass."""
+        return self._load_datapoints(self._csv_path_str, task_ids)
+    
+    def validate(self, task_id: str, datapoint: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Run validation for a specific task ID.
         
+        Uses the preloaded CSV row when one is given, otherwise looks it up.
+        Must run on the main thread, since the timeout is enforced with SIGALRM.
+        """
+        stdout = io.StringIO()
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, TIMEOUT_MINUTES * 60)
         try:
-            # Run validation with timeout
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout= TIMEOUT_MINUTES * 60,
-            )
-            
-            # Parse output
-            if result.returncode == 0:
-                return {
-                    "status": "success",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr
-                }
-            else:
-                return {
-                    "status": "failed",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
-                    "error": f"Validation failed with return code {result.returncode}"
-                }
+            # Capture everything the validators print, as the old subprocess did
+            with contextlib.redirect_stdout(stdout):
+                if datapoint is None:
+                    results = self._validate_task(task_id, self._csv_path_str)
+                else:
+                    results = self._validate_datapoint(datapoint)
+                self._print_results(results, self.verbose)
                 
-        except subprocess.TimeoutExpired:
+        except ValidationTimeout:
             return {
                 "status": "failed",
                 "error": f"Validation timed out after {TIMEOUT_MINUTES} minutes",
@@ -86,139 +115,401 @@ class DatapointValidator:
         except Exception as e:
             return {
                 "status": "failed",
+                "stdout": stdout.getvalue(),
                 "error": str(e),
                 "traceback": traceback.format_exc()
             }
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        
+        if results["overall"]:
+            return {
+                "status": "success",
+                "stdout": stdout.getvalue(),
+                "stderr": ""
+            }
+        return {
+            "status": "failed",
+            "stdout": stdout.getvalue(),
+            "stderr": "",
+            "error": "Validation failed"
+        }
+
+
+def read_task_ids_range(args: Tuple[Path, int, int, int]) -> List[str]:
+    """Read the task_id column from one record-aligned byte range of the CSV."""
+    csv_path, start, end, task_id_idx = args
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    reader = csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'))
+    return [row[task_id_idx] for row in reader if task_id_idx < len(row)]
 
 
-def initialize_tasks(tm: TaskManager, csv_path: Path) -> int:
+def read_task_ids(csv_path: Path, num_workers: int = 1) -> Iterator[str]:
+    """Yield the task_id column of the CSV in file order.
+    
+    Large files are split into record-aligned byte ranges (quoted fields
+    may contain newlines) and parsed on num_workers processes.
+    """
+    if num_workers > 1 and csv_path.stat().st_size >= INIT_PARALLEL_MIN_BYTES:
+        from scripts.create_verified_csv import split_records
+        
+        offsets = split_records(csv_path, num_workers * 4)
+        with open(csv_path, 'rb') as f:
+            header_bytes = f.read(offsets[0])
+        headers = next(csv.reader(io.TextIOWrapper(io.BytesIO(header_bytes), encoding='utf-8')), [])
+        task_id_idx = headers.index('task_id')
+        
+        jobs = [(csv_path, start, end, task_id_idx) for start, end in zip(offsets, offsets[1:])]
+        with multiprocessing.Pool(num_workers) as pool:
+            # imap returns the ranges in order, so IDs keep their file order
+            for task_ids in pool.imap(read_task_ids_range, jobs):
+                yield from task_ids
+        return
+    
+    with open(csv_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        task_id_idx = headers.index('task_id')
+        # Only one column is needed, so pull it straight out of each row
+        # list instead of building a dict per row
+        yield from (row[task_id_idx] for row in reader if task_id_idx < len(row))
+
+
+def initialize_tasks(tm: TaskManager, csv_path: Path, num_workers: int = 1) -> int:
     """Initialize validation tasks from CSV file."""
     print(f"Loading datapoints from {csv_path}")
     
     # Get existing tasks to avoid duplicates
-    existing_tasks = set()
-    summary = tm.get_status_summary()
     state = tm._load_state()
-    for task_id in state["tasks"]:
-        # Extract the original task_id from our validation task ID
-        if task_id.startswith("validate_"):
-            original_id = task_id.replace("validate_", "", 1)
-            existing_tasks.add(original_id)
+    summary = tm.get_status_summary(state)
+    existing_tasks = {
+        task["data"]["original_task_id"]
+        for task_id, task in state["tasks"].items()
+        if task_id.startswith("validate_")
+    }
     
-    # Load CSV and create tasks
+    # Stream the CSV and create tasks in batches, one state write per batch
     new_tasks = 0
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            task_id = row.get('task_id')
-            if not task_id:
-                continue
-                
-            if task_id in existing_tasks:
-                continue
-            
-            # Create validation task
-            tm.create_task(
-                task_type="validate",
-                data={
-                    "original_task_id": task_id,
-                    "csv_path": str(csv_path),
-                    "created_at": datetime.now().isoformat()
-                }
-            )
-            new_tasks += 1
+    pending = []
+    csv_path_str = str(csv_path)
+    for task_id in read_task_ids(csv_path, num_workers):
+        if not task_id or task_id in existing_tasks:
+            continue
+        existing_tasks.add(task_id)
+        
+        # Tasks in a batch are written together, so they share one
+        # creation timestamp, as create_tasks_bulk does for its own
+        if not pending:
+            created_at = datetime.now().isoformat()
+        
+        # Queue validation task
+        pending.append(("validate", {
+            "original_task_id": task_id,
+            "csv_path": csv_path_str,
+            "created_at": created_at
+        }, None))
+        if len(pending) >= CREATE_BATCH_SIZE:
+            new_tasks += len(tm.create_tasks_bulk(pending))
+            pending.clear()
+    
+    new_tasks += len(tm.create_tasks_bulk(pending))
     
     print(f"Created {new_tasks} new validation tasks")
     print(f"Total tasks in queue: {summary['total_tasks'] + new_tasks}")
     return new_tasks
 
 
+def report_result(worker_id: str, task_id: str, result: Dict[str, Any],
+                  verbose: bool) -> Tuple[TaskStatus, Dict[str, Any]]:
+    """Print the outcome of a validation and build the task completion for it."""
+    if result["status"] == "success":
+        print(f"[{worker_id}] ✅ {task_id} - Validation passed")
+        return TaskStatus.COMPLETED, {
+            "validation_result": "passed",
+            "completed_at": datetime.now().isoformat()
+        }
+    
+    # Extract error details
+    error_msg = result.get("error", "Unknown error")
+    error_trace = result.get("traceback", "")
+    stdout = result.get("stdout", "")
+    stderr = result.get("stderr", "")
+    
+    # Print failure details to stdout
+    print(f"\n[{worker_id}] ❌ {task_id} - Validation failed")
+    print(f"Error: {error_msg}")
+    if error_trace and error_trace != "TimeoutExpired":
+        print(f"Traceback:\n{error_trace}")
+    if stderr:
+        print(f"Stderr:\n{stderr}")
+    if verbose and stdout:
+        print(f"Stdout:\n{stdout}")
+    print("-" * 80)
+    
+    return TaskStatus.FAILED, {
+        "validation_result": "failed",
+        "error": error_msg,
+        "traceback": error_trace,
+        "stdout": stdout,
+        "stderr": stderr,
+        "completed_at": datetime.now().isoformat()
+    }
+
+
 def worker_process(worker_id: str, state_file: Path, csv_path: Path, verbose: bool):
-    """Worker process that pulls and processes validation tasks."""
+    """Worker that pulls and processes validation tasks straight from the state file."""
     tm = TaskManager(state_file)
     validator = DatapointValidator(csv_path, verbose)
     
     print(f"[{worker_id}] Starting worker")
     
-    while True:
-        # Get next task
-        task = tm.get_next_task(
-            agent_id=worker_id,
-            task_types=["validate"]
-        )
-        
-        if not task:
-            print(f"[{worker_id}] No more tasks available")
-            break
-        
-        task_id = task["data"]["original_task_id"]
-        print(f"[{worker_id}] Validating: {task_id}")
-        
-        # Double-check we still own this task before running validation
-        current_task = tm.get_task(task["id"])
-        if not current_task or current_task["locked_by"] != worker_id:
-            print(f"[{worker_id}] ⚠️  {task_id} - Task no longer owned by this worker, skipping")
-            continue
-        
-        # Run validation
-        result = validator.validate(task_id)
-        
-        # Update task based on result
-        if result["status"] == "success":
-            success = tm.complete_task(
-                task_id=task["id"],
+    # Results are written back in batches, like the dispatcher does
+    pending = []
+    first_pending_at = 0.0
+    try:
+        while True:
+            # Get next task
+            task = tm.get_next_task(
                 agent_id=worker_id,
-                status=TaskStatus.COMPLETED,
-                result_data={
-                    "validation_result": "passed",
-                    "completed_at": datetime.now().isoformat()
-                }
+                task_types=["validate"]
             )
-            if success:
-                print(f"[{worker_id}] ✅ {task_id} - Validation passed")
-            else:
-                print(f"[{worker_id}] ⚠️  {task_id} - Could not complete task (possibly timed out)")
-        else:
-            # Extract error details
-            error_msg = result.get("error", "Unknown error")
-            error_trace = result.get("traceback", "")
-            stdout = result.get("stdout", "")
-            stderr = result.get("stderr", "")
             
-            # Print failure details to stdout
-            print(f"\n[{worker_id}] ❌ {task_id} - Validation failed")
-            print(f"Error: {error_msg}")
-            if error_trace and error_trace != "TimeoutExpired":
-                print(f"Traceback:\n{error_trace}")
-            if stderr:
-                print(f"Stderr:\n{stderr}")
-            if verbose and stdout:
-                print(f"Stdout:\n{stdout}")
-            print("-" * 80)
+            if not task:
+                print(f"[{worker_id}] No more tasks available")
+                break
             
-            # Update task with failure details
-            success = tm.complete_task(
-                task_id=task["id"],
-                agent_id=worker_id,
-                status=TaskStatus.FAILED,
-                result_data={
-                    "validation_result": "failed",
-                    "error": error_msg,
-                    "traceback": error_trace,
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "completed_at": datetime.now().isoformat()
-                }
-            )
-            if not success:
-                print(f"[{worker_id}] ⚠️  {task_id} - Could not mark task as failed (possibly timed out)")
+            task_id = task["data"]["original_task_id"]
+            print(f"[{worker_id}] Validating: {task_id}")
+            
+            # Run validation and queue the result
+            result = validator.validate(task_id)
+            status, result_data = report_result(worker_id, task_id, result, verbose)
+            if not pending:
+                first_pending_at = time.monotonic()
+            pending.append((task["id"], task_id, status, result_data))
+            
+            if (len(pending) >= RESULT_BATCH_SIZE or
+                    time.monotonic() - first_pending_at >= RESULT_FLUSH_SECONDS):
+                record_results(tm, pending, worker_id)
+                pending = []
+    finally:
+        # Don't lose finished validations if the loop is interrupted
+        record_results(tm, pending, worker_id)
     
     print(f"[{worker_id}] Worker finished")
 
 
+def queue_worker(worker_id: str, csv_path: Path, verbose: bool,
+                 send_q: multiprocessing.Queue, recv_q: multiprocessing.Queue,
+                 backlog: Optional[List[Tuple[str, str]]] = None):
+    """Worker that validates tasks fed by the dispatcher and sends back the results.
+    
+    Never touches the state file. Work arrives on send_q as lists of
+    (tm_task_id, task_id) pairs, and a None means no more work; a backlog
+    batch, left over from a crashed predecessor, is done first. Messages on
+    recv_q are (kind, worker_id, payload) tuples: "batch" when a batch is
+    taken on, "done" with each result and "exit" once the worker stops.
+    """
+    validator = DatapointValidator(csv_path, verbose)
+    print(f"[{worker_id}] Starting worker")
+    
+    batches = iter(send_q.get, None)
+    if backlog:
+        batches = itertools.chain([backlog], batches)
+    
+    for batch in batches:
+        recv_q.put(("batch", worker_id, batch))
+        try:
+            datapoints = validator.load([task_id for _, task_id in batch])
+        except Exception:
+            # Let each validation look its own row up and report the error
+            datapoints = {}
+        
+        for tm_task_id, task_id in batch:
+            print(f"[{worker_id}] Validating: {task_id}")
+            result = validator.validate(task_id, datapoints.get(task_id))
+            status, result_data = report_result(worker_id, task_id, result, verbose)
+            recv_q.put(("done", worker_id, (tm_task_id, task_id, status, result_data)))
+    
+    recv_q.put(("exit", worker_id, None))
+    print(f"[{worker_id}] Worker finished")
+
+
+def dispatch_tasks(tm: TaskManager, send_q: multiprocessing.Queue, recv_q: multiprocessing.Queue,
+                   num_workers: int, batch_size: int):
+    """Claim pending tasks in bulk and feed them to the workers batch_size at a time.
+    
+    If claiming fails (e.g. a lock timeout), the traceback is sent on recv_q
+    as an "error" message so the run fails; the workers are told to stop
+    either way, so none of them waits on send_q forever.
+    """
+    try:
+        while True:
+            claimed = tm.claim_tasks(DISPATCHER_ID, num_workers * batch_size, task_types=["validate"])
+            if not claimed:
+                break
+            pairs = [(task["id"], task["data"]["original_task_id"]) for task in claimed]
+            for start in range(0, len(pairs), batch_size):
+                send_q.put(pairs[start:start + batch_size])
+        
+        print(f"[{DISPATCHER_ID}] No more tasks available")
+    except Exception:
+        recv_q.put(("error", DISPATCHER_ID, traceback.format_exc()))
+    finally:
+        for _ in range(num_workers):
+            send_q.put(None)
+
+
+def record_results(tm: TaskManager, results: List[Tuple[str, str, TaskStatus, Dict[str, Any]]],
+                   agent_id: str = DISPATCHER_ID):
+    """Write a batch of worker results back to the state file as agent_id."""
+    if not results:
+        return
+    completions = [(tm_task_id, agent_id, status, data) for tm_task_id, _, status, data in results]
+    for (_, task_id, _, _), success in zip(results, tm.complete_tasks_bulk(completions)):
+        if not success:
+            print(f"[{agent_id}] ⚠️  {task_id} - Could not record result (possibly timed out)")
+
+
+def run_workers(tm: TaskManager, csv_path: Path, num_workers: int, verbose: bool,
+                batch_size: int = DEFAULT_BATCH_SIZE):
+    """Validate on num_workers processes, with this process owning the state file.
+    
+    A dispatcher thread claims tasks in bulk and queues them batch_size at
+    a time; the workers only validate. Results are written back in batches of
+    RESULT_BATCH_SIZE, or after RESULT_FLUSH_SECONDS so a slow trickle of
+    results is not held back for long.
+    
+    A worker that dies mid-validation (segfault, OOM kill, os._exit in the
+    code under test) has that task recorded as failed and is replaced, so
+    one bad datapoint doesn't cost a worker for the rest of the run.
+    
+    If the dispatcher fails, the workers finish what they already have, the
+    results are recorded, and a RuntimeError is raised.
+    
+    Tasks still held by the dispatcher from an interrupted run are released
+    first, rather than waiting out the task timeout.
+    """
+    released = tm.release_agent_tasks(DISPATCHER_ID)
+    if released:
+        print(f"[{DISPATCHER_ID}] Released {len(released)} tasks left claimed by an earlier run")
+    
+    send_q = multiprocessing.Queue(maxsize=2 * num_workers)
+    recv_q = multiprocessing.Queue()
+    
+    def start_worker(worker_id: str, backlog: Optional[List[Tuple[str, str]]] = None) -> multiprocessing.Process:
+        p = multiprocessing.Process(
+            target=queue_worker,
+            args=(worker_id, csv_path, verbose, send_q, recv_q, backlog)
+        )
+        p.start()
+        return p
+    
+    processes = {}
+    for i in range(num_workers):
+        worker_id = f"worker-{i+1:03d}"
+        processes[worker_id] = start_worker(worker_id)
+    
+    dispatcher = threading.Thread(target=dispatch_tasks,
+                                  args=(tm, send_q, recv_q, num_workers, batch_size),
+                                  daemon=True)
+    dispatcher.start()
+    
+    # Unfinished part of each worker's current batch, in validation order
+    in_flight = {}
+    finished_workers = set()
+    results = []
+    dispatcher_errors = []
+    
+    def handle(kind: str, worker_id: str, payload: Any):
+        if kind == "batch":
+            in_flight[worker_id] = list(payload)
+        elif kind == "done":
+            in_flight[worker_id].pop(0)
+            results.append(payload)
+        elif kind == "error":
+            print(f"[{DISPATCHER_ID}] ❌ Dispatcher failed:\n{payload}", file=sys.stderr)
+            dispatcher_errors.append(payload)
+        else:
+            finished_workers.add(worker_id)
+    
+    def reap_crashed():
+        dead = [worker_id for worker_id, p in processes.items()
+                if worker_id not in finished_workers and not p.is_alive()]
+        if not dead:
+            return
+        # Everything a dead worker sent is in the pipe by now; read it first
+        # so one that finished its task just before dying isn't blamed for it
+        while True:
+            try:
+                handle(*recv_q.get_nowait())
+            except queue.Empty:
+                break
+        for worker_id in dead:
+            if worker_id in finished_workers:
+                continue
+            p = processes[worker_id]
+            remaining = in_flight.pop(worker_id, None)
+            if not remaining:
+                # Died outside a validation, e.g. during startup; a
+                # replacement would most likely do the same
+                print(f"[{DISPATCHER_ID}] ⚠️  {worker_id} exited unexpectedly (code {p.exitcode})")
+                finished_workers.add(worker_id)
+                continue
+            (tm_task_id, task_id), backlog = remaining[0], remaining[1:]
+            print(f"[{DISPATCHER_ID}] ⚠️  {worker_id} died validating {task_id} (code {p.exitcode}), restarting it")
+            results.append((tm_task_id, task_id, TaskStatus.FAILED, {
+                "validation_result": "failed",
+                "error": f"Worker exited with code {p.exitcode} during validation",
+                "traceback": "",
+                "stdout": "",
+                "stderr": "",
+                "completed_at": datetime.now().isoformat()
+            }))
+            # The replacement picks up the rest of the batch
+            processes[worker_id] = start_worker(worker_id, backlog)
+    
+    pending = []
+    first_pending_at = 0.0
+    next_reap_at = time.monotonic() + 1
+    while len(finished_workers) < num_workers:
+        try:
+            handle(*recv_q.get(timeout=1))
+        except queue.Empty:
+            pass
+        if time.monotonic() >= next_reap_at:
+            reap_crashed()
+            next_reap_at = time.monotonic() + 1
+        
+        if results:
+            if not pending:
+                first_pending_at = time.monotonic()
+            pending.extend(results)
+            results.clear()
+        
+        if pending and (len(pending) >= RESULT_BATCH_SIZE or
+                        time.monotonic() - first_pending_at >= RESULT_FLUSH_SECONDS):
+            record_results(tm, pending)
+            pending = []
+    
+    record_results(tm, pending)
+    
+    # Wait for all workers to complete
+    for p in processes.values():
+        p.join()
+    
+    if dispatcher_errors:
+        raise RuntimeError("Task dispatcher failed, see the traceback above")
+
+
 def monitor_progress(tm: TaskManager):
     """Display current progress and statistics."""
-    summary = tm.get_status_summary()
+    # Parse the state once for both the summary and the failure details
+    state = tm._load_state()
+    summary = tm.get_status_summary(state)
     
     print("\n" + "="*60)
     print("Validation Progress")
@@ -229,63 +520,66 @@ def monitor_progress(tm: TaskManager):
         if count > 0:
             print(f"  {status}: {count}")
     
-    # Show failed tasks
-    state = tm._load_state()
-    failed_tasks = []
-    for task_id, task in state["tasks"].items():
-        if task["status"] == TaskStatus.FAILED.value:
-            failed_tasks.append({
-                "task_id": task["data"]["original_task_id"],
-                "error": task["data"].get("error", "Unknown error"),
-                "stderr": task["data"].get("stderr", ""),
-                "stdout": task["data"].get("stdout", ""),
-                "traceback": task["data"].get("traceback", "")
-            })
-    
-    if failed_tasks:
-        # Group errors by type
-        error_groups = {}
-        for task in failed_tasks:
-            error_type = task["error"]
-            if error_type not in error_groups:
-                error_groups[error_type] = []
-            error_groups[error_type].append(task)
-        
+    # Show failed tasks. Walk the state lazily rather than copying every
+    # failed task's output into a list; the detailed section re-walks it.
+    def failed_tasks():
+        for task in state["tasks"].values():
+            if task["status"] == TaskStatus.FAILED.value:
+                yield task["data"]
+
+    failed_count = 0
+    first_failures = []
+    # Per error: how often it occurred and the first few task IDs with it
+    error_counts = Counter()
+    error_examples = defaultdict(list)
+    for data in failed_tasks():
+        task_id = data["original_task_id"]
+        error = data.get("error", "Unknown error")
+        failed_count += 1
+        if len(first_failures) < 10:
+            first_failures.append((task_id, error))
+        error_counts[error] += 1
+        if len(error_examples[error]) < 5:
+            error_examples[error].append(task_id)
+    
+    if failed_count:
         # Display summary
-        print(f"\nFailed tasks ({len(failed_tasks)}):")
-        for task in failed_tasks[:10]:  # Show first 10
-            print(f"  - {task['task_id']}: {task['error']}")
-        if len(failed_tasks) > 10:
-            print(f"  ... and {len(failed_tasks) - 10} more")
+        print(f"\nFailed tasks ({failed_count}):")
+        for task_id, error in first_failures:  # Show first 10
+            print(f"  - {task_id}: {error}")
+        if failed_count > 10:
+            print(f"  ... and {failed_count - 10} more")
         
         # Display grouped errors
         print("\n" + "="*60)
         print("Error Groups")
         print("="*60)
-        for error_type, tasks in sorted(error_groups.items(), key=lambda x: len(x[1]), reverse=True):
-            print(f"\n{error_type} ({len(tasks)} tasks):")
-            for task in tasks[:5]:  # Show first 5 of each type
-                print(f"  - {task['task_id']}")
-            if len(tasks) > 5:
-                print(f"  ... and {len(tasks) - 5} more")
+        for error_type, count in error_counts.most_common():
+            print(f"\n{error_type} ({count} tasks):")
+            for task_id in error_examples[error_type]:  # Show first 5 of each type
+                print(f"  - {task_id}")
+            if count > 5:
+                print(f"  ... and {count - 5} more")
         
         # Display all individual errors with details
         print("\n" + "="*60)
         print("All Failed Tasks (Detailed)")
         print("="*60)
-        for i, task in enumerate(failed_tasks, 1):
-            print(f"\n[{i}] Task: {task['task_id']}")
-            print(f"    Error: {task['error']}")
-            if task.get('traceback') and task['traceback'] not in ['', 'TimeoutExpired']:
+        for i, data in enumerate(failed_tasks(), 1):
+            print(f"\n[{i}] Task: {data['original_task_id']}")
+            print(f"    Error: {data.get('error', 'Unknown error')}")
+            if data.get('traceback') and data['traceback'] not in ['', 'TimeoutExpired']:
                 print(f"    Traceback:")
-                for line in task['traceback'].strip().split('\n'):
+                for line in data['traceback'].strip().split('\n'):
                     print(f"      {line}")
-            if task.get('stderr'):
+            if data.get('stderr'):
                 print(f"    Stderr:")
-                for line in task['stderr'].strip().split('\n')[:10]:  # First 10 lines
+                # Split once; stderr can be large
+                lines = data['stderr'].strip().split('\n')
+                for line in lines[:10]:  # First 10 lines
                     print(f"      {line}")
-                if len(task['stderr'].strip().split('\n')) > 10:
-                    print(f"      ... ({len(task['stderr'].strip().split('\n')) - 10} more lines)")
+                if len(lines) > 10:
+                    print(f"      ... ({len(lines) - 10} more lines)")
     
     print("="*60)
 
@@ -323,6 +617,19 @@ def main():
         action='store_true',
         help='Show detailed validation output'
     )
+    parser.add_argument(
+        '--init-workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Processes used to read task IDs from CSVs over '
+             f'{INIT_PARALLEL_MIN_BYTES // (1024 * 1024)} MiB (default: CPU count)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Datapoints handed to a worker at a time with --workers > 1 (default: {DEFAULT_BATCH_SIZE})'
+    )
     
     args = parser.parse_args()
     
@@ -339,7 +646,7 @@ def main():
     
     if args.mode == 'init':
         # Initialize tasks from CSV
-        initialize_tasks(tm, csv_path)
+        initialize_tasks(tm, csv_path, args.init_workers)
         
     elif args.mode == 'monitor':
         # Show current progress
@@ -350,7 +657,11 @@ def main():
         summary = tm.get_status_summary()
         if summary['total_tasks'] == 0:
             print("No tasks found, initializing from CSV...")
-            initialize_tasks(tm, csv_path)
+            initialize_tasks(tm, csv_path, args.init_workers)
+        
+        # Fold any WAL left by init or an earlier run into the snapshot so
+        # each worker starts from a single parse rather than a long replay
+        tm.compact()
         
         # Start worker processes
         if args.workers == 1:
@@ -358,19 +669,7 @@ def main():
             worker_process("worker-001", state_file, csv_path, args.verbose)
         else:
             # Multi-process mode
-            processes = []
-            for i in range(args.workers):
-                worker_id = f"worker-{i+1:03d}"
-                p = multiprocessing.Process(
-                    target=worker_process,
-                    args=(worker_id, state_file, csv_path, args.verbose)
-                )
-                p.start()
-                processes.append(p)
-            
-            # Wait for all workers to complete
-            for p in processes:
-                p.join()
+            run_workers(tm, csv_path, args.workers, args.verbose, args.batch_size)
         
         # Show final summary
         monitor_progress(tm)
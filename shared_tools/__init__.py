@@ -3,17 +3,11 @@ Shared tools for the data generation pipeline.
 These tools are used by multiple agents in the pipeline.
 """
 
-# Make validators available at package level
-from .validators import (
-    DockerfileValidator,
-    TestSyntaxValidator,
-    TestWeightsValidator,
-    ContainerExecutionValidator,
-    cleanup_docker_image,
-    ValidationResult,
-    Validator
-)
+import importlib
 
+# Make validators available at package level. They are loaded on first
+# access, so importing a light submodule (e.g. shared_tools.csv_rows) doesn't
+# pull in the validators and everything they import.
 __all__ = [
     'DockerfileValidator',
     'TestSyntaxValidator',
@@ -22,4 +16,12 @@ __all__ = [
     'cleanup_docker_image',
     'ValidationResult',
     'Validator'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        value = getattr(importlib.import_module('.validators', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
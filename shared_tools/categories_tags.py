@@ -39,10 +39,18 @@ VALID_TAGS = [
     "web", "web-scraping", "web-server"
 ]
 
+# Precomputed lookups so membership checks are a hash probe rather than a
+# list scan; the lists above keep their order for display
+VALID_CATEGORY_SET = frozenset(VALID_CATEGORIES)
+VALID_TAG_SET = frozenset(VALID_TAGS)
+
+# Sorted, comma-separated category list for error messages
+VALID_CATEGORIES_STR = ', '.join(sorted(VALID_CATEGORIES))
+
 
 def validate_category(category: str) -> bool:
     """Check if a category is valid."""
-    return category in VALID_CATEGORIES
+    return category in VALID_CATEGORY_SET
 
 
 def validate_tags(tags: str) -> tuple[bool, str]:
@@ -55,7 +63,7 @@ def validate_tags(tags: str) -> tuple[bool, str]:
     if not tags:
         return False, "At least one tag is required"
     
-    tag_list = [t.strip() for t in tags.split('|') if t.strip()]
+    tag_list = [t for t in (part.strip() for part in tags.split('|')) if t]
     
     if len(tag_list) == 0:
         return False, "No valid tags provided"
@@ -63,18 +71,10 @@ def validate_tags(tags: str) -> tuple[bool, str]:
     if len(tag_list) > 3:
         return False, f"Too many tags ({len(tag_list)}). Maximum 3 tags allowed."
     
-    invalid_tags = [tag for tag in tag_list if tag not in VALID_TAGS]
-    if invalid_tags:
-        return False, f"Invalid tags: {', '.join(invalid_tags)}"
+    # Common case is all-valid, answered by one set check with no list built
+    if VALID_TAG_SET.issuperset(tag_list):
+        return True, ""
     
-    return True, ""
-
-
-def get_category_set() -> set[str]:
-    """Get categories as a set for fast lookup."""
-    return set(VALID_CATEGORIES)
-
+    invalid_tags = [tag for tag in tag_list if tag not in VALID_TAG_SET]
+    return False, f"Invalid tags: {', '.join(invalid_tags)}"
 
-def get_tag_set() -> set[str]:
-    """Get tags as a set for fast lookup."""
-    return set(VALID_TAGS)
\ No newline at end of file
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+csv_rows.py - Locate and rewrite a single datapoint row in a CSV file
+
+Patching one datapoint used to parse every row of the CSV into a dict and
+write the whole file back out. These helpers find the byte span of the
+target record instead, and replace only that span; every other byte of the
+file is copied through unchanged.
+
+Record spans are cached in a JSON sidecar (<csv>.idx) keyed by the CSV's
+size and mtime, so repeated lookups seek straight to the row. A stale or
+missing sidecar is rebuilt on the next lookup.
+
+atomic_write() is the replace-via-temporary-file helper these writes (and
+the patch history files) go through.
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+# Handle imports for both package and script-directory usage
+if __package__:
+    from .fileio import write_all
+else:
+    from fileio import write_all
+
+
+@dataclass
+class CsvRecord:
+    """A datapoint row together with where it sits in the CSV file."""
+    fieldnames: List[str]
+    row: Dict[str, str]
+    start: int
+    end: int
+    # (st_size, st_mtime_ns) of the file the span was read from
+    signature: Tuple[int, int]
+
+
+# One CSV record: quoted sections (which may hold newlines, and run to EOF
+# if unterminated) or any other non-newline byte, then the ending newline.
+# Escaped quotes ("") are just two adjacent quoted sections
+_RECORD_RE = re.compile(rb'(?:"[^"]*(?:"|\Z)|[^"\n])*\n?')
+
+
+def _record_end(mm: mmap.mmap, pos: int) -> int:
+    """Return the offset just past the record starting at pos."""
+    return _RECORD_RE.match(mm, pos).end()
+
+
+def _parse_record(data: bytes) -> List[str]:
+    """Parse one record's bytes as the text-mode reads elsewhere would."""
+    return next(csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')), [])
+
+
+# Devices where an O_TMPFILE can't be linked into place (e.g. overlayfs
+# returns EXDEV), so atomic_write goes straight to mkstemp there
+_NO_TMPFILE_DEVICES = set()
+
+
+def _write_via_tmpfile(path: Path, chunks: Sequence[bytes], mode: int) -> bool:
+    """Write path through an unnamed O_TMPFILE; False if that isn't supported here."""
+    # Linking the file into place goes through /proc/self/fd
+    if not hasattr(os, 'O_TMPFILE') or not os.path.isdir('/proc/self/fd'):
+        return False
+    
+    dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+    try:
+        device = os.fstat(dir_fd).st_dev
+        if device in _NO_TMPFILE_DEVICES:
+            return False
+        try:
+            fd = os.open('.', os.O_TMPFILE | os.O_WRONLY | os.O_CLOEXEC, mode, dir_fd=dir_fd)
+        except OSError:
+            _NO_TMPFILE_DEVICES.add(device)
+            return False
+        
+        temp_name = f'.{path.name}.{os.urandom(6).hex()}.tmp'
+        try:
+            os.fchmod(fd, mode)
+            write_all(fd, chunks)
+            # linkat() can't replace an existing file, so link under a
+            # temporary name and rename that over the target
+            try:
+                os.link(f'/proc/self/fd/{fd}', temp_name, dst_dir_fd=dir_fd, follow_symlinks=True)
+            except OSError:
+                _NO_TMPFILE_DEVICES.add(device)
+                return False
+        finally:
+            os.close(fd)
+        
+        try:
+            os.replace(temp_name, path.name, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+        except Exception:
+            os.unlink(temp_name, dir_fd=dir_fd)
+            raise
+        return True
+    finally:
+        os.close(dir_fd)
+
+
+def atomic_write(path: Path, chunks: Sequence[bytes]) -> None:
+    """Replace path with the concatenated chunks, so readers never see a partial file.
+    
+    On Linux the data goes into an unnamed O_TMPFILE that only gets a name
+    once fully written, so a crash can't leave a temp file behind. Where
+    that isn't supported a named mkstemp file is used instead. An existing
+    file keeps its permissions; new files get 0644.
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o644
+    
+    if _write_via_tmpfile(path, chunks, mode):
+        return
+    
+    # Write to a temporary file first, then atomically replace
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=f'.{path.name}.', dir=path.parent)
+    try:
+        with os.fdopen(temp_fd, 'wb') as f:
+            os.fchmod(f.fileno(), mode)
+            write_all(f.fileno(), chunks)
+        os.replace(temp_path, path)
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _signature(st: os.stat_result) -> Tuple[int, int]:
+    return st.st_size, st.st_mtime_ns
+
+
+def _index_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + '.idx')
+
+
+def _load_index(csv_path: Path, signature: Tuple[int, int]) -> Optional[Dict[str, List[int]]]:
+    """Return the cached task_id -> [start, end] spans if they match signature."""
+    try:
+        with open(_index_path(csv_path), 'rb') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if tuple(index.get('signature', ())) != signature:
+        return None
+    return index['spans']
+
+
+def _save_index(csv_path: Path, signature: Tuple[int, int], spans: Dict[str, List[int]]) -> None:
+    """Write the span cache next to the CSV; it is only a cache, so failures are ignored."""
+    data = json.dumps({'signature': list(signature), 'spans': spans}).encode('utf-8')
+    try:
+        atomic_write(_index_path(csv_path), [data])
+    except OSError:
+        pass
+
+
+def _record_task_id(mm: mmap.mmap, start: int, end: int, task_id_idx: int) -> str:
+    """Read the task_id field of one record."""
+    # task_id is normally the first, unquoted column: slice it out directly
+    if task_id_idx == 0 and mm[start:start + 1] != b'"':
+        comma = mm.find(b',', start, end)
+        field = mm[start:comma if comma != -1 else end]
+        if b'"' not in field:
+            return field.rstrip(b'\r\n').decode('utf-8')
+    values = _parse_record(mm[start:end])
+    return values[task_id_idx] if task_id_idx < len(values) else ''
+
+
+def _build_index(mm: mmap.mmap, header_end: int, task_id_idx: int) -> Dict[str, List[int]]:
+    """Walk every record once and map each task_id to its first span."""
+    spans = {}
+    start = header_end
+    while start < len(mm):
+        end = _record_end(mm, start)
+        task_id = _record_task_id(mm, start, end, task_id_idx)
+        if task_id and task_id not in spans:
+            spans[task_id] = [start, end]
+        start = end
+    return spans
+
+
+def _find_in_file(f: BinaryIO, csv_path: Path, task_id: str) -> CsvRecord:
+    """Find the row for task_id in an open CSV file."""
+    signature = _signature(os.fstat(f.fileno()))
+    if signature[0] == 0:
+        raise ValueError(f"Task '{task_id}' not found in CSV")
+    
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_end = _record_end(mm, 0)
+        fieldnames = _parse_record(mm[:header_end])
+        task_id_idx = fieldnames.index('task_id')
+        
+        spans = _load_index(csv_path, signature)
+        for rebuilt in (spans is None, True):
+            if rebuilt:
+                spans = _build_index(mm, header_end, task_id_idx)
+                _save_index(csv_path, signature, spans)
+            
+            span = spans.get(task_id)
+            if span is None:
+                break
+            start, end = span
+            values = _parse_record(mm[start:end])
+            # The signature can't rule out every rewrite, so check the row
+            # and rebuild the index once if it points somewhere else
+            if task_id_idx < len(values) and values[task_id_idx] == task_id:
+                row = dict(zip(fieldnames, values))
+                return CsvRecord(fieldnames, row, start, end, signature)
+            if rebuilt:
+                break
+    
+    raise ValueError(f"Task '{task_id}' not found in CSV")
+
+
+def find_record(csv_path: Path, task_id: str) -> CsvRecord:
+    """Find the row for task_id without parsing the rest of the CSV."""
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    
+    with open(csv_path, 'rb') as f:
+        return _find_in_file(f, csv_path, task_id)
+
+
+def write_record(csv_path: Path, record: CsvRecord) -> None:
+    """Write record.row back over its span, copying the rest of the file as is.
+    
+    If the file changed since the record was found, its span is looked up
+    again first so a concurrent edit to another row is not overwritten.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=record.fieldnames)
+    writer.writerow(record.row)
+    encoded = buffer.getvalue().encode('utf-8')
+    
+    with open(csv_path, 'rb') as f:
+        if _signature(os.fstat(f.fileno())) != record.signature:
+            fresh = _find_in_file(f, csv_path, record.row['task_id'])
+            record.start, record.end, record.signature = fresh.start, fresh.end, fresh.signature
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            atomic_write(csv_path, [mm[:record.start], encoded, mm[record.end:]])
+        
+        # Keep the span cache current: rows after this one shift by the
+        # change in its length
+        spans = _load_index(csv_path, record.signature)
+        if spans is not None:
+            shift = len(encoded) - (record.end - record.start)
+            if shift:
+                for span in spans.values():
+                    if span[0] >= record.end:
+                        span[0] += shift
+                        span[1] += shift
+            spans[record.row['task_id']] = [record.start, record.start + len(encoded)]
+            _save_index(csv_path, _signature(csv_path.stat()), spans)
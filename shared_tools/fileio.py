@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+fileio.py - Low-level file writing helpers
+
+Kept free of heavier imports so the agent scripts can use it without
+adding to their startup time.
+"""
+
+import os
+from typing import Sequence
+
+
+# Maximum number of buffers accepted by a single writev call
+IOV_MAX = os.sysconf('SC_IOV_MAX')
+
+
+def write_all(fd: int, chunks: Sequence[bytes]) -> None:
+    """Write every chunk to fd, gathering them into as few writev calls as possible."""
+    pending = [memoryview(chunk) for chunk in chunks if chunk]
+    index = 0
+    while index < len(pending):
+        written = os.writev(fd, pending[index:index + IOV_MAX])
+        
+        # Skip fully written chunks and trim a partially written one
+        while written > 0:
+            size = len(pending[index])
+            if written >= size:
+                written -= size
+                index += 1
+            else:
+                pending[index] = pending[index][written:]
+                written = 0
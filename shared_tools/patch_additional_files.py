@@ -33,36 +33,23 @@ Usage:
 """
 
 import argparse
-import csv
+import io
+import itertools
 import json
 import os
 import sys
-import tempfile
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 
-
-def read_csv_data(csv_path: Path) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Read all data from CSV file."""
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV file not found: {csv_path}")
-    
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-    
-    return rows, fieldnames
-
-
-def find_task_row(rows: List[Dict[str, str]], task_id: str) -> int:
-    """Find the row index for a given task ID."""
-    for i, row in enumerate(rows):
-        if row['task_id'] == task_id:
-            return i
-    raise ValueError(f"Task '{task_id}' not found in CSV")
+# Handle imports for both module and script usage
+if __name__ == '__main__':
+    from csv_rows import atomic_write, find_record, write_record
+else:
+    from .csv_rows import atomic_write, find_record, write_record
 
 
 def get_workspace_path(task_id: str) -> Path:
@@ -71,23 +58,37 @@ def get_workspace_path(task_id: str) -> Path:
     return base_path
 
 
+# Threads reading workspace files in sync mode
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directories this process has already created or seen, so repeat calls
+# skip the mkdir syscalls
+_KNOWN_DIRS = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create path (and its parents) unless it is already known to exist."""
+    key = str(path)
+    if key not in _KNOWN_DIRS:
+        os.makedirs(key, exist_ok=True)
+        _KNOWN_DIRS.add(key)
+
+
 def ensure_workspace_exists(workspace_path: Path) -> None:
     """Ensure workspace directory structure exists."""
-    workspace_path.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(workspace_path)
     
     # Create files subdirectory if it doesn't exist
-    files_dir = workspace_path / 'files'
-    files_dir.mkdir(exist_ok=True)
+    _ensure_dir(workspace_path / 'files')
     
     # Create history directory
-    history_dir = workspace_path / '.history'
-    history_dir.mkdir(exist_ok=True)
+    _ensure_dir(workspace_path / '.history')
 
 
 def save_history(workspace_path: Path, operation: str, changes: Dict[str, Any]) -> None:
     """Save operation history for audit trail."""
     history_dir = workspace_path / '.history'
-    history_dir.mkdir(exist_ok=True)
+    _ensure_dir(history_dir)
     
     timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
     history_file = history_dir / f"{timestamp}_{operation}.json"
@@ -98,34 +99,101 @@ def save_history(workspace_path: Path, operation: str, changes: Dict[str, Any])
         'changes': changes
     }
     
-    with open(history_file, 'w') as f:
-        json.dump(history_entry, f, indent=2)
+    atomic_write(history_file, [json.dumps(history_entry, indent=2).encode('utf-8')])
 
 
-def sync_from_workspace(workspace_path: Path, task_id: str) -> Dict[str, str]:
-    """Read all files from workspace and create additional_files JSON."""
+def walk_files(root: str, rel_root: str = '') -> Iterator[Tuple[str, str]]:
+    """Yield (path, path relative to root) for every file below root.
+    
+    Same files and order as Path.rglob('*') filtered to files, but the
+    file/directory checks come from the scandir entries' d_type, so only
+    symlinks need a stat. Symlinked directories are not descended into,
+    as with rglob; symlinked files are included.
+    """
+    subdirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            rel_path = os.path.join(rel_root, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((entry.path, rel_path))
+            elif entry.is_file():
+                yield entry.path, rel_path
+    
+    for path, rel_path in subdirs:
+        yield from walk_files(path, rel_path)
+
+
+def decode_text(raw: bytes) -> str:
+    """Decode UTF-8 file bytes with text-mode newline translation."""
+    content = raw.decode('utf-8')
+    if b'\r' in raw:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def read_text_file(file_path: str) -> str:
+    """Read a UTF-8 file in one read, with text-mode newline translation."""
+    with open(file_path, 'rb') as f:
+        return decode_text(f.read())
+
+
+def iter_workspace_files(workspace_path: Path) -> Iterator[Tuple[str, str]]:
+    """Yield (relative path, content) for each readable file in the workspace."""
     files_dir = workspace_path / 'files'
-    if not files_dir.exists():
-        return {}
-    
-    additional_files = {}
-    
-    for file_path in files_dir.rglob('*'):
-        if file_path.is_file():
-            rel_path = file_path.relative_to(files_dir)
+    if not files_dir.is_dir():
+        return
+    
+    files = walk_files(str(files_dir))
+    
+    # Reads overlap on a thread pool (file I/O releases the GIL). Only a
+    # bounded window is in flight, so just a few files are held in memory
+    # and results still come back in walk order
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = deque(
+            (file_path, executor.submit(read_text_file, file_path), rel_path)
+            for file_path, rel_path in itertools.islice(files, 2 * READ_WORKERS)
+        )
+        while pending:
+            file_path, future, rel_path = pending.popleft()
+            for next_path, next_rel_path in itertools.islice(files, 1):
+                pending.append((next_path, executor.submit(read_text_file, next_path), next_rel_path))
+            
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    additional_files[str(rel_path)] = f.read()
+                content = future.result()
             except Exception as e:
                 print(f"Warning: Could not read {file_path}: {e}")
-    
-    return additional_files
+                continue
+            yield rel_path, content
+
+
+def sync_from_workspace(workspace_path: Path, task_id: str) -> Dict[str, str]:
+    """Read all files from workspace and create additional_files JSON."""
+    return dict(iter_workspace_files(workspace_path))
+
+
+def dump_additional_files(files: Iterable[Tuple[str, str]]) -> Tuple[str, int]:
+    """Encode (path, content) pairs as the additional_files JSON object.
+    
+    The output is exactly json.dumps() of the equivalent dict, but each file
+    is encoded as it arrives, so only one file's content is held alongside
+    the JSON being built. Returns the JSON text and the number of files.
+    """
+    out = io.StringIO()
+    count = 0
+    for rel_path, content in files:
+        out.write(', ' if count else '{')
+        out.write(json.dumps(rel_path))
+        out.write(': ')
+        out.write(json.dumps(content))
+        count += 1
+    out.write('}' if count else '{}')
+    return out.getvalue(), count
 
 
 def update_file_in_workspace(workspace_path: Path, file_name: str, content: str) -> None:
     """Update or create a file in the workspace."""
     files_dir = workspace_path / 'files'
-    files_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(files_dir)
     
     file_path = files_dir / file_name
     
@@ -144,14 +212,15 @@ def remove_file_from_workspace(workspace_path: Path, file_name: str) -> bool:
     if file_path.exists():
         file_path.unlink()
         
-        # Clean up empty parent directories
-        try:
-            parent = file_path.parent
-            while parent != files_dir and not any(parent.iterdir()):
+        # Clean up empty parent directories; rmdir fails on the first
+        # one that isn't empty, so there is no need to list them
+        parent = file_path.parent
+        while parent != files_dir:
+            try:
                 parent.rmdir()
-                parent = parent.parent
-        except:
-            pass
+            except OSError:
+                break
+            parent = parent.parent
         
         return True
     return False
@@ -166,25 +235,30 @@ def replace_all_files_in_workspace(workspace_path: Path, source_dir: Path) -> Di
         shutil.rmtree(files_dir)
     files_dir.mkdir(parents=True)
     
-    # Copy new files
+    # Copy new files, reading each source file once for both the copy and
+    # the returned content
     additional_files = {}
-    for file_path in source_dir.rglob('*'):
-        if file_path.is_file():
-            rel_path = file_path.relative_to(source_dir)
-            dest_path = files_dir / rel_path
-            
-            # Create parent directories
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Copy file
-            shutil.copy2(file_path, dest_path)
-            
-            # Read content for return
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    additional_files[str(rel_path)] = f.read()
-            except Exception as e:
-                print(f"Warning: Could not read {file_path}: {e}")
+    created_dirs = {str(files_dir)}
+    for file_path, rel_path in list(walk_files(str(source_dir))):
+        dest_path = os.path.join(files_dir, rel_path)
+        
+        # Create parent directories
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir not in created_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            created_dirs.add(dest_dir)
+        
+        # Copy file, keeping metadata as shutil.copy2 does
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        with open(dest_path, 'wb') as f:
+            f.write(raw)
+        shutil.copystat(file_path, dest_path)
+        
+        try:
+            additional_files[rel_path] = decode_text(raw)
+        except Exception as e:
+            print(f"Warning: Could not read {file_path}: {e}")
     
     return additional_files
 
@@ -198,9 +272,9 @@ def patch_additional_files(
     file_name: Optional[str] = None
 ) -> None:
     """Main function to patch additional files."""
-    # Read current CSV data
-    rows, fieldnames = read_csv_data(csv_path)
-    row_index = find_task_row(rows, task_id)
+    # Find the task row; the rest of the CSV is never parsed
+    record = find_record(csv_path, task_id)
+    row = record.row
     
     # Get workspace path
     if workspace:
@@ -218,10 +292,10 @@ def patch_additional_files(
     
     if mode == 'sync':
         # Sync from workspace to CSV
-        additional_files = sync_from_workspace(workspace_path, task_id)
-        rows[row_index]['additional_files'] = json.dumps(additional_files)
-        changes['files_synced'] = len(additional_files)
-        print(f"✓ Synced {len(additional_files)} files from workspace to CSV")
+        row['additional_files'], files_synced = dump_additional_files(
+            iter_workspace_files(workspace_path))
+        changes['files_synced'] = files_synced
+        print(f"✓ Synced {files_synced} files from workspace to CSV")
     
     elif mode == 'update':
         # Update/add a single file
@@ -239,8 +313,7 @@ def patch_additional_files(
         update_file_in_workspace(workspace_path, file_name, content)
         
         # Sync to CSV
-        additional_files = sync_from_workspace(workspace_path, task_id)
-        rows[row_index]['additional_files'] = json.dumps(additional_files)
+        row['additional_files'], _ = dump_additional_files(iter_workspace_files(workspace_path))
         
         changes['file_updated'] = file_name
         changes['file_size'] = len(content)
@@ -256,8 +329,7 @@ def patch_additional_files(
         
         if removed:
             # Sync to CSV
-            additional_files = sync_from_workspace(workspace_path, task_id)
-            rows[row_index]['additional_files'] = json.dumps(additional_files)
+            row['additional_files'], _ = dump_additional_files(iter_workspace_files(workspace_path))
             changes['file_removed'] = file_name
             print(f"✓ Removed file '{file_name}'")
         else:
@@ -274,7 +346,7 @@ def patch_additional_files(
         
         # Replace all files
         additional_files = replace_all_files_in_workspace(workspace_path, workspace)
-        rows[row_index]['additional_files'] = json.dumps(additional_files)
+        row['additional_files'] = json.dumps(additional_files)
         
         changes['files_replaced'] = len(additional_files)
         print(f"✓ Replaced all files ({len(additional_files)} files)")
@@ -297,35 +369,20 @@ def patch_additional_files(
         update_file_in_workspace(workspace_path, file_name, content)
         
         # Sync to CSV
-        additional_files = sync_from_workspace(workspace_path, task_id)
-        rows[row_index]['additional_files'] = json.dumps(additional_files)
+        row['additional_files'], _ = dump_additional_files(iter_workspace_files(workspace_path))
         
         changes['file_appended'] = file_name
         changes['file_size'] = len(content)
         print(f"✓ Added new file '{file_name}' ({len(content)} chars)")
     
     # Update timestamp
-    rows[row_index]['updated_at'] = datetime.now(timezone.utc).isoformat()
+    row['updated_at'] = datetime.now(timezone.utc).isoformat()
     
     # Save history
     save_history(workspace_path.parent, f"patch_additional_files_{mode}", changes)
     
-    # Write back to CSV using temporary file for safety
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=csv_path.parent)
-    try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        
-        # Replace original file
-        os.replace(temp_path, csv_path)
-        
-    except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        raise
+    # Splice the updated row into the CSV, via a temporary file for safety
+    write_record(csv_path, record)
     
     print(f"✓ Updated datapoint '{task_id}' in {csv_path.name}")
 
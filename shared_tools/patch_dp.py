@@ -21,38 +21,24 @@ Usage:
 """
 
 import argparse
-import csv
 import json
-import os
+import re
 import sys
-import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import List, Tuple, Any
 
+# Handle imports for both module and script usage
+if __name__ == '__main__':
+    from csv_rows import find_record, write_record
+else:
+    from .csv_rows import find_record, write_record
 
-VALID_COLUMNS = ['prompt', 'dockerfile', 'test_functions', 'test_weights', 'difficulty']
-
-
-def read_staging_data(staging_path: Path) -> Tuple[List[Dict[str, str]], List[str]]:
-    """Read all data from CSV file."""
-    if not staging_path.exists():
-        raise FileNotFoundError(f"CSV file not found: {staging_path}")
-    
-    with open(staging_path, 'r') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        rows = list(reader)
-    
-    return rows, fieldnames
 
+VALID_COLUMNS = ['prompt', 'dockerfile', 'test_functions', 'test_weights', 'difficulty']
 
-def find_task_row(rows: List[Dict[str, str]], task_id: str) -> int:
-    """Find the row index for a given task ID."""
-    for i, row in enumerate(rows):
-        if row['task_id'] == task_id:
-            return i
-    raise ValueError(f"Task '{task_id}' not found in CSV")
+# Matches test function definitions, capturing the function name
+TEST_DEF_RE = re.compile(r'^[ \t]*(?:async[ \t]+)?def[ \t]+(test_\w+)', re.MULTILINE)
 
 
 def read_file_content(file_path: Path, column: str) -> str:
@@ -72,8 +58,12 @@ def read_file_content(file_path: Path, column: str) -> str:
         raise RuntimeError(f"Error reading file for column '{column}': {e}")
 
 
-def validate_column_content(column: str, content: str, file_path: Path = None) -> str:
-    """Validate content based on column type."""
+def validate_column_content(column: str, content: str, file_path: Path = None) -> Tuple[str, Any]:
+    """Validate content based on column type.
+    
+    Returns the value to store in the CSV and the parsed content (the weights
+    dict for test_weights, otherwise the content itself).
+    """
     if column == 'test_weights':
         # Validate weights JSON
         try:
@@ -100,11 +90,11 @@ def validate_column_content(column: str, content: str, file_path: Path = None) -
                 raise ValueError(f"Weight must be positive: {test_name}={weight}")
         
         # Return as JSON string for CSV storage
-        return json.dumps(weights)
+        return json.dumps(weights), weights
     
     
     # For other columns, just return the content
-    return content
+    return content, content
 
 
 def patch_datapoint(
@@ -113,14 +103,13 @@ def patch_datapoint(
     staging_path: Path
 ) -> None:
     """Update specific columns of a datapoint."""
-    # Read current data
-    rows, fieldnames = read_staging_data(staging_path)
-    
-    # Find the task row
-    row_index = find_task_row(rows, task_id)
+    # Find the task row; the rest of the CSV is never parsed
+    record = find_record(staging_path, task_id)
+    row = record.row
     
     # Process updates
     applied_updates = []
+    weights = None
     for column, file_path in updates:
         # Normalize column name
         if column == 'tests':
@@ -136,40 +125,28 @@ def patch_datapoint(
         
         # Read and validate content
         content = read_file_content(file_path, column)
-        validated_content = validate_column_content(column, content, file_path)
+        validated_content, parsed = validate_column_content(column, content, file_path)
+        if column == 'test_weights':
+            weights = parsed
         
         # Apply update
-        rows[row_index][column] = validated_content
+        row[column] = validated_content
         applied_updates.append((column, len(validated_content)))
     
     # Update timestamp
-    rows[row_index]['updated_at'] = datetime.now(timezone.utc).isoformat()
+    row['updated_at'] = datetime.now(timezone.utc).isoformat()
     
     # If updating test_weights, validate against test_functions
+    # (weights holds the stored value already parsed, so it isn't re-read)
     if 'test_weights' in [col for col, _ in updates]:
-        weights = json.loads(rows[row_index]['test_weights'])
-        tests = rows[row_index]['test_functions']
+        defined_tests = set(TEST_DEF_RE.findall(row['test_functions']))
         
         for test_name in weights:
-            if f"def {test_name}" not in tests:
+            if test_name not in defined_tests:
                 raise ValueError(f"Test function '{test_name}' not found in test_functions")
     
-    # Write back to CSV using temporary file for safety
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.csv', dir=staging_path.parent)
-    try:
-        with os.fdopen(temp_fd, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        
-        # Replace original file
-        os.replace(temp_path, staging_path)
-        
-    except Exception:
-        # Clean up temp file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        raise
+    # Splice the updated row into the CSV, via a temporary file for safety
+    write_record(staging_path, record)
     
     # Report success
     print(f"✓ Updated datapoint '{task_id}':")
@@ -8,7 +8,8 @@ import argparse
 import csv
 import json
 import sys
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List
 
 # Handle imports for both module and script usage
 if __name__ == '__main__':
@@ -20,6 +21,7 @@ if __name__ == '__main__':
         ContainerExecutionValidator,
         cleanup_docker_image
     )
+    from csv_rows import find_record
 else:
     # When imported as a module
     from .validators import (
@@ -29,17 +31,45 @@ else:
         ContainerExecutionValidator,
         cleanup_docker_image
     )
+    from .csv_rows import find_record
 
 
 def load_datapoint(csv_path: str, task_id: str) -> Dict[str, str]:
     """Load a specific datapoint from the CSV."""
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row.get('task_id') == task_id:
-                return row
+    try:
+        # Seeks straight to the row via the CSV's row index
+        return find_record(Path(csv_path), task_id).row
+    except ValueError:
+        raise ValueError(f"Task ID '{task_id}' not found in {csv_path}")
+
+
+def load_datapoints(csv_path: str, task_ids: List[str]) -> Dict[str, Dict[str, str]]:
+    """Load several datapoints from the CSV in a single pass.
     
-    raise ValueError(f"Task ID '{task_id}' not found in {csv_path}")
+    IDs that aren't in the CSV are simply absent from the result.
+    """
+    wanted = set(task_ids)
+    found = {}
+    with open(csv_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        if 'task_id' not in fieldnames:
+            return found
+        task_id_idx = fieldnames.index('task_id')
+        # Rows stay plain lists; only the wanted ones become dicts, filled
+        # out the way csv.DictReader would
+        for values in reader:
+            if task_id_idx >= len(values) or values[task_id_idx] not in wanted:
+                continue
+            row = dict(zip(fieldnames, values))
+            if len(values) < len(fieldnames):
+                row.update(dict.fromkeys(fieldnames[len(values):]))
+            elif len(values) > len(fieldnames):
+                row[None] = values[len(fieldnames):]
+            found[values[task_id_idx]] = row
+            if len(found) == len(wanted):
+                break
+    return found
 
 
 def validate_datapoint(task_data: Dict[str, str]) -> Dict[str, Any]:
@@ -79,6 +109,11 @@ def validate_datapoint(task_data: Dict[str, str]) -> Dict[str, Any]:
     return results
 
 
+def validate_task(task_id: str, csv_path: str) -> Dict[str, Any]:
+    """Load a datapoint from the CSV and validate it."""
+    return validate_datapoint(load_datapoint(csv_path, task_id))
+
+
 def print_validation_results(results: Dict[str, Any], verbose: bool = False):
     """Pretty print validation results."""
     print(f"\n{'='*50}")
@@ -164,11 +199,8 @@ def main():
     args = parser.parse_args()
     
     try:
-        # Load the datapoint
-        task_data = load_datapoint(args.csv_path, args.task_id)
-        
-        # Validate it
-        results = validate_datapoint(task_data)
+        # Load and validate the datapoint
+        results = validate_task(args.task_id, args.csv_path)
         
         # Output results
         if args.json:
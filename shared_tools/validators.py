@@ -128,7 +128,8 @@ class DockerfileValidator(Validator):
                 # Build the Docker image
                 result = subprocess.run(
                     ['docker', 'build', '--no-cache', '--force-rm', '-t', image_tag, '-f', dockerfile_path, temp_dir],
-                    capture_output=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
                     text=True
                 )
                 
@@ -143,7 +144,7 @@ class DockerfileValidator(Validator):
             except Exception as e:
                 # Try to clean up on any error
                 try:
-                    subprocess.run(['docker', 'rmi', '-f', image_tag], capture_output=True)
+                    subprocess.run(['docker', 'rmi', '-f', image_tag], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 except Exception:
                     pass
                 raise e
@@ -592,7 +593,8 @@ bash $TEST_DIR/run-pytest.sh
             # Start the container
             start_result = subprocess.run(
                 ['docker', 'run', '-d', '--name', container_name, image_tag, 'sleep', 'infinity'],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
             
@@ -602,8 +604,8 @@ bash $TEST_DIR/run-pytest.sh
             # Check if tmux is available
             tmux_check = subprocess.run(
                 ['docker', 'exec', container_name, 'which', 'tmux'],
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             if tmux_check.returncode != 0:
@@ -612,8 +614,8 @@ bash $TEST_DIR/run-pytest.sh
             # Check if asciinema is available
             asciinema_check = subprocess.run(
                 ['docker', 'exec', container_name, 'which', 'asciinema'],
-                capture_output=True,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
             if asciinema_check.returncode != 0:
@@ -622,7 +624,8 @@ bash $TEST_DIR/run-pytest.sh
             # Copy test files to container
             copy_result = subprocess.run(
                 ['docker', 'cp', temp_dir + '/.', f"{container_name}:/tests"],
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
             
@@ -643,8 +646,8 @@ bash $TEST_DIR/run-pytest.sh
                 
         finally:
             # Always clean up the container
-            subprocess.run(['docker', 'stop', container_name], capture_output=True)
-            subprocess.run(['docker', 'rm', '-f', container_name], capture_output=True)
+            subprocess.run(['docker', 'stop', container_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            subprocess.run(['docker', 'rm', '-f', container_name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
     def _parse_test_output(self, test_output: str) -> Dict[str, Any]:
         """Parse test output to extract test results."""
@@ -736,6 +739,6 @@ def cleanup_docker_image(image_tag: Optional[str]):
     """Clean up Docker image if it was created."""
     if image_tag:
         try:
-            subprocess.run(['docker', 'rmi', '-f', image_tag], capture_output=True)
+            subprocess.run(['docker', 'rmi', '-f', image_tag], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         except Exception:
             pass
\ No newline at end of file
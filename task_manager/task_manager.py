@@ -7,13 +7,33 @@ parent-child relationships, and automatic timeout handling.
 
 import json
 import fcntl
+import threading
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialise to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
 
 class TaskStatus(Enum):
     """Task status enumeration."""
@@ -27,7 +47,8 @@ class TaskStatus(Enum):
 class TaskManager:
     """Generic task manager with file-based persistence and locking."""
     
-    def __init__(self, state_file: Path, lock_timeout: int = 5, task_timeout_hours: int = 24):
+    def __init__(self, state_file: Path, lock_timeout: int = 5, task_timeout_hours: int = 24,
+                 wal_compact_bytes: int = 4 * 1024 * 1024):
         """
         Initialize the task manager.
         
@@ -35,11 +56,19 @@ class TaskManager:
             state_file: Path to the state JSON file
             lock_timeout: Maximum seconds to wait for file lock
             task_timeout_hours: Hours before auto-releasing stale tasks
+            wal_compact_bytes: WAL size at which it is folded back into the state file
         """
         self.state_file = Path(state_file)
         self.lock_file = self.state_file.with_suffix('.lock')
+        self.wal_file = self.state_file.with_suffix('.wal')
         self.lock_timeout = lock_timeout
         self.task_timeout_hours = task_timeout_hours
+        self.wal_compact_bytes = wal_compact_bytes
+        # Whether the current thread holds the exclusive lock
+        self._thread_state = threading.local()
+        # Threads of this process queue here for the exclusive lock, so a
+        # release wakes the next one at once instead of on its next poll
+        self._writer_lock = threading.Lock()
         
         # Ensure directory exists
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
@@ -58,12 +87,17 @@ class TaskManager:
             },
             "tasks": {}
         }
-        with open(self.state_file, 'w') as f:
-            json.dump(initial_state, f, indent=2)
+        with open(self.state_file, 'wb') as f:
+            f.write(json_dumps(initial_state, indent=True))
+        # A WAL left behind by a deleted state file must not be replayed
+        self.wal_file.unlink(missing_ok=True)
     
-    def _acquire_lock(self) -> Any:
+    def _acquire_lock(self, shared: bool = False) -> Any:
         """
-        Acquire exclusive file lock.
+        Acquire file lock.
+        
+        Args:
+            shared: Take a shared (read) lock instead of an exclusive one
         
         Returns:
             File handle with lock
@@ -71,40 +105,128 @@ class TaskManager:
         Raises:
             TimeoutError: If lock cannot be acquired within timeout
         """
-        lock_handle = open(self.lock_file, 'w')
         start_time = time.time()
+        if not shared and not self._writer_lock.acquire(timeout=self.lock_timeout):
+            raise TimeoutError(f"Could not acquire lock within {self.lock_timeout} seconds")
+        lock_handle = open(self.lock_file, 'w')
         
         while True:
             try:
-                fcntl.flock(lock_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(lock_handle, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+                if not shared:
+                    self._thread_state.lock_held = True
                 return lock_handle
             except IOError:
                 if time.time() - start_time > self.lock_timeout:
                     lock_handle.close()
+                    if not shared:
+                        self._writer_lock.release()
                     raise TimeoutError(f"Could not acquire lock within {self.lock_timeout} seconds")
                 time.sleep(0.01)
     
     def _release_lock(self, lock_handle: Any) -> None:
         """Release file lock."""
+        exclusive = getattr(self._thread_state, "lock_held", False)
+        self._thread_state.lock_held = False
         fcntl.flock(lock_handle, fcntl.LOCK_UN)
         lock_handle.close()
+        if exclusive:
+            self._writer_lock.release()
     
     def _load_state(self) -> Dict[str, Any]:
-        """Load state from file."""
-        with open(self.state_file, 'r') as f:
-            return json.load(f)
+        """Load state from the snapshot file and replay the WAL on top of it."""
+        # Readers outside a mutation take a shared lock so a concurrent
+        # compaction can't swap the snapshot between our two reads
+        lock_held = getattr(self._thread_state, "lock_held", False)
+        lock_handle = None if lock_held else self._acquire_lock(shared=True)
+        try:
+            with open(self.state_file, 'rb') as f:
+                state = json_loads(f.read())
+            try:
+                with open(self.wal_file, 'rb') as f:
+                    wal_lines = f.read().split(b'\n')
+            except FileNotFoundError:
+                return state
+        finally:
+            if lock_handle is not None:
+                self._release_lock(lock_handle)
+        
+        tasks = state["tasks"]
+        for line in wal_lines:
+            if not line.strip():
+                continue
+            try:
+                record = json_loads(line)
+            except ValueError:
+                # Torn write from an interrupted append; the records are
+                # newline-delimited so nothing else is affected
+                continue
+            if record.get("op") == "put":
+                tasks[record["id"]] = record["task"]
+                state["metadata"]["last_updated"] = record["at"]
+        return state
     
     def _save_state(self, state: Dict[str, Any]) -> None:
-        """Save state to file atomically."""
+        """Save full state snapshot atomically and truncate the WAL."""
         state["metadata"]["last_updated"] = datetime.now().isoformat()
         
         # Write to temporary file first
         temp_file = self.state_file.with_suffix('.tmp')
-        with open(temp_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        with open(temp_file, 'wb') as f:
+            f.write(json_dumps(state, indent=True))
         
         # Atomic rename
         temp_file.replace(self.state_file)
+        
+        # The snapshot now contains every WAL record; replaying them again
+        # after a crash here is harmless since each record is a full task
+        with open(self.wal_file, 'wb'):
+            pass
+    
+    def _save_tasks(self, state: Dict[str, Any], task_ids: List[str]) -> None:
+        """
+        Persist changes to the given tasks by appending them to the WAL.
+        
+        Must be called with the exclusive lock held. Falls back to a full
+        snapshot once the WAL grows past wal_compact_bytes.
+        
+        Args:
+            state: Current state dictionary
+            task_ids: IDs of the tasks that were created or modified
+        """
+        now = datetime.now().isoformat()
+        state["metadata"]["last_updated"] = now
+        records = [
+            json_dumps({"op": "put", "id": task_id, "task": state["tasks"][task_id], "at": now})
+            for task_id in task_ids
+        ]
+        # Each record starts with a newline so a torn previous append
+        # can't swallow it
+        with open(self.wal_file, 'ab') as f:
+            f.write(b'\n' + b'\n'.join(records) + b'\n')
+            wal_size = f.tell()
+        
+        if wal_size >= self.wal_compact_bytes:
+            self._save_state(state)
+    
+    def compact(self) -> int:
+        """
+        Fold the WAL into the state file snapshot.
+        
+        Returns:
+            Size in bytes of the WAL that was folded in
+        """
+        lock_handle = self._acquire_lock()
+        try:
+            try:
+                wal_size = self.wal_file.stat().st_size
+            except FileNotFoundError:
+                wal_size = 0
+            if wal_size:
+                self._save_state(self._load_state())
+            return wal_size
+        finally:
+            self._release_lock(lock_handle)
     
     def _check_timeouts(self, state: Dict[str, Any]) -> List[str]:
         """
@@ -169,12 +291,51 @@ class TaskManager:
                 "data": data
             }
             
-            self._save_state(state)
+            self._save_tasks(state, [task_id])
             return task_id
             
         finally:
             self._release_lock(lock_handle)
     
+    def create_tasks_bulk(self, specs: List[Tuple[str, Dict[str, Any], Optional[str]]]) -> List[str]:
+        """
+        Create several tasks with a single state write.
+        
+        Args:
+            specs: List of (task_type, data, parent_id) tuples
+            
+        Returns:
+            New task IDs, in the same order as specs
+        """
+        if not specs:
+            return []
+        
+        lock_handle = self._acquire_lock()
+        try:
+            state = self._load_state()
+            created_at = datetime.now().isoformat()
+            
+            task_ids = []
+            for task_type, data, parent_id in specs:
+                task_id = f"{task_type}_{uuid.uuid4().hex[:8]}"
+                state["tasks"][task_id] = {
+                    "type": task_type,
+                    "status": TaskStatus.PENDING.value,
+                    "parent_id": parent_id,
+                    "locked_by": None,
+                    "locked_at": None,
+                    "completed_at": None,
+                    "created_at": created_at,
+                    "data": data
+                }
+                task_ids.append(task_id)
+            
+            self._save_tasks(state, task_ids)
+            return task_ids
+            
+        finally:
+            self._release_lock(lock_handle)
+    
     def get_next_task(self, agent_id: str, task_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Get next available task for an agent.
@@ -192,8 +353,6 @@ class TaskManager:
             
             # Check for timeouts first
             released = self._check_timeouts(state)
-            if released:
-                self._save_state(state)
             
             # Find next available task
             for task_id, task in state["tasks"].items():
@@ -209,7 +368,7 @@ class TaskManager:
                     # Add task_started_at for better tracking
                     task["task_started_at"] = datetime.now().isoformat()
                     
-                    self._save_state(state)
+                    self._save_tasks(state, released + [task_id])
                     
                     # Return task with ID
                     return {
@@ -217,11 +376,57 @@ class TaskManager:
                         **task
                     }
             
+            if released:
+                self._save_tasks(state, released)
             return None
             
         finally:
             self._release_lock(lock_handle)
     
+    def claim_tasks(self, agent_id: str, count: int,
+                    task_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Claim up to count pending tasks for an agent with a single state write.
+        
+        Args:
+            agent_id: Unique identifier for the agent
+            count: Maximum number of tasks to claim
+            task_types: Optional list of task types to filter by
+            
+        Returns:
+            List of claimed task dictionaries with ID (empty if none available)
+        """
+        lock_handle = self._acquire_lock()
+        try:
+            state = self._load_state()
+            
+            # Check for timeouts first
+            released = self._check_timeouts(state)
+            
+            claimed = []
+            now = datetime.now().isoformat()
+            for task_id, task in state["tasks"].items():
+                if len(claimed) >= count:
+                    break
+                if task["status"] != TaskStatus.PENDING.value:
+                    continue
+                if task_types and task["type"] not in task_types:
+                    continue
+                
+                task["status"] = TaskStatus.IN_PROGRESS.value
+                task["locked_by"] = agent_id
+                task["locked_at"] = now
+                task["task_started_at"] = now
+                claimed.append(task_id)
+            
+            if released or claimed:
+                self._save_tasks(state, released + claimed)
+            
+            return [{"id": task_id, **state["tasks"][task_id]} for task_id in claimed]
+            
+        finally:
+            self._release_lock(lock_handle)
+    
     def complete_task(self, task_id: str, agent_id: str, 
                       status: TaskStatus = TaskStatus.COMPLETED,
                       result_data: Optional[Dict[str, Any]] = None) -> bool:
@@ -260,12 +465,56 @@ class TaskManager:
             if result_data:
                 task["data"].update(result_data)
             
-            self._save_state(state)
+            self._save_tasks(state, [task_id])
             return True
             
         finally:
             self._release_lock(lock_handle)
     
+    def complete_tasks_bulk(self, completions: List[Tuple[str, str, TaskStatus, Optional[Dict[str, Any]]]]) -> List[bool]:
+        """
+        Complete several tasks with a single state write.
+        
+        Args:
+            completions: List of (task_id, agent_id, status, result_data) tuples
+            
+        Returns:
+            Per-completion success flags, with the same meaning as complete_task
+        """
+        if not completions:
+            return []
+        
+        lock_handle = self._acquire_lock()
+        try:
+            state = self._load_state()
+            
+            results = []
+            completed_ids = []
+            now = datetime.now().isoformat()
+            for task_id, agent_id, status, result_data in completions:
+                task = state["tasks"].get(task_id)
+                # Verify task exists and is locked by this agent
+                if task is None or task["locked_by"] != agent_id:
+                    results.append(False)
+                    continue
+                
+                task["status"] = status.value
+                task["completed_at"] = now
+                task["locked_by"] = None
+                task["locked_at"] = None
+                if result_data:
+                    task["data"].update(result_data)
+                
+                completed_ids.append(task_id)
+                results.append(True)
+            
+            if completed_ids:
+                self._save_tasks(state, completed_ids)
+            return results
+            
+        finally:
+            self._release_lock(lock_handle)
+    
     def release_task(self, task_id: str, agent_id: str) -> bool:
         """
         Release a task back to pending status.
@@ -296,12 +545,45 @@ class TaskManager:
             task["locked_at"] = None
             # Keep task_started_at if it exists (for tracking original start time)
             
-            self._save_state(state)
+            self._save_tasks(state, [task_id])
             return True
             
         finally:
             self._release_lock(lock_handle)
     
+    def release_agent_tasks(self, agent_id: str) -> List[str]:
+        """
+        Release every in-progress task locked by an agent, with a single state write.
+        
+        Meant for an agent restarting after an interruption, so tasks it had
+        claimed don't wait out task_timeout_hours before being picked up again.
+        
+        Args:
+            agent_id: Agent whose tasks to release
+            
+        Returns:
+            List of task IDs that were released
+        """
+        lock_handle = self._acquire_lock()
+        try:
+            state = self._load_state()
+            
+            released = []
+            for task_id, task in state["tasks"].items():
+                if (task["status"] == TaskStatus.IN_PROGRESS.value and
+                    task["locked_by"] == agent_id):
+                    task["status"] = TaskStatus.PENDING.value
+                    task["locked_by"] = None
+                    task["locked_at"] = None
+                    released.append(task_id)
+            
+            if released:
+                self._save_tasks(state, released)
+            return released
+            
+        finally:
+            self._release_lock(lock_handle)
+    
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a specific task by ID.
@@ -345,14 +627,18 @@ class TaskManager:
         
         return children
     
-    def get_status_summary(self) -> Dict[str, Any]:
+    def get_status_summary(self, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Get summary statistics about tasks.
         
+        Args:
+            state: Already-loaded state to summarise instead of reading the file
+        
         Returns:
             Dictionary with status counts and metadata
         """
-        state = self._load_state()
+        if state is None:
+            state = self._load_state()
         
         # Count by status
         status_counts = {status.value: 0 for status in TaskStatus}
@@ -412,7 +698,7 @@ class TaskManager:
             state["tasks"][task_id]["data"].update(data)
             state["tasks"][task_id]["updated_at"] = datetime.now().isoformat()
             
-            self._save_state(state)
+            self._save_tasks(state, [task_id])
             return True
             
         finally: